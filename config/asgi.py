@@ -13,4 +13,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault ('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application ()
\ No newline at end of file
+application = get_asgi_application ()
+
+# Con gunicorn el calentamiento lo hacen los hooks de gunicorn.conf.py.
+# Otros servidores (uvicorn, runserver) lo piden con CALENTAR_AL_ARRANCAR=True;
+# importar este módulo por sí solo no toca la base ni el cache.
+from django.conf import settings  # noqa: E402
+
+if settings.CALENTAR_AL_ARRANCAR:
+    from cv.calentamiento import calentar
+    calentar ()
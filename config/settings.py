@@ -3,7 +3,7 @@ Django settings for config project.
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 import os
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -34,13 +34,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Antes que el resto: los estáticos se sirven sin sesión ni CSRF
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Brotli/gzip para el HTML de las vistas (WhiteNoise ya comprime los estáticos)
+    'cv.middleware.CompresionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -49,31 +52,96 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Cada plantilla se compila una vez por proceso y queda en memoria.
+            # config/wsgi.py las precarga al arrancar (cv.calentamiento); en
+            # desarrollo el autoreload vacía este cache al editar una plantilla.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Calentar (cv.calentamiento) al importar config.wsgi/asgi; con gunicorn no hace
+# falta, gunicorn.conf.py calienta cada worker en post_fork
+CALENTAR_AL_ARRANCAR = config('CALENTAR_AL_ARRANCAR', default=False, cast=bool)
+
 
 # ========================================
 # BASE DE DATOS
 # ========================================
 
+# Cada conexión nueva aplica estos PRAGMA (cv/management/commands/
+# medir_sqlite_concurrencia.py los compara con los valores por defecto):
+# - WAL: las lecturas del sitio no esperan a que el admin termine de escribir
+# - NORMAL: con WAL no se pierde consistencia, solo el último commit si se va la luz
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,  # negativo = KiB, ~20 MB por conexión
+    'mmap_size': 128 * 1024 * 1024,
+    'busy_timeout': 5000,  # ms esperando al escritor antes de 'database is locked'
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Una conexión por worker reutilizada entre requests
+        'CONN_MAX_AGE': config('CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {pragma}={valor}' for pragma, valor in SQLITE_PRAGMAS.items()),
+            # Toma el lock de escritura al empezar la transacción: sin esto dos
+            # escritores que suben de lectura a escritura fallan sin esperar
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Réplicas de solo lectura para las páginas públicas (cv.routers): rutas de
+# copias SQLite separadas por comas. Las mantiene al día un proceso aparte,
+# `manage.py sincronizar_replicas --intervalo 30`; mientras una réplica no
+# tenga el último cambio del admin, las páginas públicas leen de la principal
+for numero, ruta in enumerate(config('DATABASE_REPLICAS', default='', cast=Csv()), 1):
+    DATABASES[f'replica_{numero}'] = {**DATABASES['default'], 'NAME': ruta, 'TEST': {'MIRROR': 'default'}}
+
+REPLICAS_LECTURA = [alias for alias in DATABASES if alias.startswith('replica_')]
+
+DATABASE_ROUTERS = ['cv.routers.RouterReplicas']
+
+
+# ========================================
+# CACHE
+# Compartido entre workers de gunicorn (disco local)
+# ========================================
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+    }
+}
+
+# Segundos que vive la página /cv/ en cache (se invalida al guardar en el admin)
+CV_CACHE_TIMEOUT = config('CV_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Identificador del despliegue (p. ej. el commit). Entra en la huella de las
+# páginas cacheadas junto con el contenido de las plantillas
+VERSION_DESPLIEGUE = config('VERSION_DESPLIEGUE', default='')
+
 
 # ========================================
 # VALIDACIÓN DE CONTRASEÑAS
@@ -104,7 +172,15 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Bootstrap, Bootstrap Icons e Inter van dentro de cv/static/cv (sin CDN;
+# solo Poppins, la de los títulos, sigue viniendo de Google Fonts).
+# collectstatic les pone hash en el nombre y genera .gz y .br; WhiteNoise
+# los sirve con caché de un año. `manage.py subsetear_estaticos` recorta
+# iconos y fuentes a lo que usan las plantillas.
+# cv.estaticos.EstaticosCV (WhiteNoise) además minifica cv/css y cv/js y
+# genera el CSS crítico que se inserta en línea en cv.html.
+STATICFILES_BACKEND = 'cv.estaticos.EstaticosCV'
 
 # Directorio adicional para archivos estáticos (si lo usas)
 # STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
@@ -113,39 +189,45 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 # ========================================
 # ARCHIVOS MEDIA (SUBIDOS POR USUARIOS)
 # Certificados, fotos, PDFs, imágenes de productos
-# ALMACENADOS EN: AZURE BLOB STORAGE
+# SE ESCRIBEN EN DISCO LOCAL Y SE REPLICAN A AZURE BLOB STORAGE
 # ========================================
 
-# Backend para almacenar archivos media
+# Copia local (fuente de verdad inmediata)
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+MEDIA_URL = '/media/'
+
+# Storage remoto al que se replica en segundo plano.
+# Vacío = sin espejo (trabajo offline / mediciones locales)
+MEDIA_ESPEJO = config('MEDIA_ESPEJO', default='storages.backends.azure_storage.AzureStorage')
+
 # ==============================
-# STORAGE (LOCAL vs AZURE)
+# STORAGE (LOCAL + ESPEJO AZURE)
 # ==============================
 
 STORAGES = {
     "default": {
-        "BACKEND": "storages.backends.azure_storage.AzureStorage",
+        "BACKEND": "cv.storage.AlmacenamientoEspejo",
+        "OPTIONS": {
+            "location": MEDIA_ROOT,
+            "base_url": MEDIA_URL,
+            "espejo": MEDIA_ESPEJO,
+        },
     },
     "staticfiles": {
-        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        "BACKEND": STATICFILES_BACKEND,
     },
 }
 
 
 # Credenciales de Azure (desde .env)
-AZURE_ACCOUNT_NAME = config('AZURE_ACCOUNT_NAME')
-AZURE_ACCOUNT_KEY = config('AZURE_ACCOUNT_KEY')
+AZURE_ACCOUNT_NAME = config('AZURE_ACCOUNT_NAME', default='')
+AZURE_ACCOUNT_KEY = config('AZURE_ACCOUNT_KEY', default='')
 AZURE_CONTAINER = config('AZURE_CONTAINER', default='media')
 
 # Dominio de Azure
-AZURE_CUSTOM_DOMAIN = f'{AZURE_ACCOUNT_NAME}.blob.core.windows.net'
-
-# URL pública de los archivos
+# URL pública de los archivos replicados
 # Ejemplo: https://cvjeanpi21.blob.core.windows.net/media/certificados/cert1.jpg
-MEDIA_URL = f"https://{AZURE_ACCOUNT_NAME}.blob.core.windows.net/{AZURE_CONTAINER}/"
-
-
-# ⚠️ NO definir MEDIA_ROOT cuando usas Azure
-# MEDIA_ROOT solo se usa para almacenamiento LOCAL
+AZURE_CUSTOM_DOMAIN = f'{AZURE_ACCOUNT_NAME}.blob.core.windows.net'
 
 
 # ========================================
@@ -160,9 +242,16 @@ AZURE_UPLOAD_MAX_CONN = 2
 AZURE_TIMEOUT = 20
 AZURE_MAX_MEMORY_SIZE = 2 * 1024 * 1024  # 2MB
 
+# Las subidas se escriben a disco por bloques de 64 KB a medida que llegan
+# (con sha256 y progreso) en lugar de armarse en memoria o en /tmp
+FILE_UPLOAD_HANDLERS = ['cv.subidas.SubidaEnStreamingHandler']
+
 # Headers HTTP para archivos subidos
+# Los nombres llevan el hash del contenido (cv.storage): un archivo nunca
+# cambia bajo el mismo nombre, así que el navegador lo guarda por 1 año
+MEDIA_CACHE_CONTROL = 'public, max-age=31536000, immutable'
 AZURE_OBJECT_PARAMETERS = {
-    'cache_control': 'max-age=86400',  # Cache por 1 día
+    'cache_control': MEDIA_CACHE_CONTROL,
 }
 
 
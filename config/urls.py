@@ -15,11 +15,15 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from cv.views import media_local
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('cv.urls')),
+    # Media aún no replicada en Azure (ver cv.storage.AlmacenamientoEspejo)
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), media_local, name='media_local'),
 ]
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault ('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application ()
+
+# Con gunicorn el calentamiento lo hacen los hooks de gunicorn.conf.py.
+# Otros servidores (uvicorn, runserver) lo piden con CALENTAR_AL_ARRANCAR=True;
+# importar este módulo por sí solo no toca la base ni el cache.
+from django.conf import settings  # noqa: E402
+
+if settings.CALENTAR_AL_ARRANCAR:
+    from cv.calentamiento import calentar
+    calentar ()
@@ -1,12 +1,11 @@
+from django import forms
 from django.contrib import admin
+from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.core.files.base import ContentFile
-import requests
-import tempfile
-import os
-import io
-from pdf2image import convert_from_path
+from .imagenes import url_mas_pequena
+from .miniaturas import necesita_miniatura, encolar_miniatura
+from .subidas import checksum_valido
 from .models import Habilidad
 
 from .models import (
@@ -14,18 +13,41 @@ from .models import (
     Certificado, Proyecto, Reconocimiento, Referencia, Garage
 )
 
+# ============================================
+# SUBIDAS GRANDES (PDF de certificados y reconocimientos)
+# ============================================
+class ArchivoConChecksumForm(forms.ModelForm):
+    """
+    subidas_admin.js calcula el sha256 en el navegador y lo manda en
+    'archivo__sha256'; aquí se compara con el calculado mientras el archivo
+    llegaba (cv.subidas). Sin JavaScript no hay comparación.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'archivo' in self.fields:
+            self.fields['archivo'].widget.attrs['data-progreso'] = reverse('subida_progreso', args=['ID'])
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data.get('archivo')
+        if not checksum_valido(archivo, self.data.get('archivo__sha256')):
+            raise forms.ValidationError('El archivo llegó dañado o incompleto (el checksum no coincide). Vuelve a subirlo.')
+        return archivo
+
+
 # ============================================
 # ADMIN: Perfil
 # ============================================
 @admin.register(Perfil)
 class PerfilAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'profesion', 'email', 'tiene_foto')
-    search_fields = ('nombre', 'email')
+    list_display = ('nombre', 'profesion', 'email', 'slug', 'tiene_foto')
+    search_fields = ('nombre', 'email', 'slug')
+    prepopulated_fields = {'slug': ('nombre',)}
     
     fieldsets = (
         ('👤 Información Principal', {
             'fields': (
-                'nombre', 'profesion', 'descripcion', 'foto'
+                'nombre', 'slug', 'profesion', 'descripcion', 'foto'
             )
         }),
         ('🆔 Identificación', {
@@ -127,10 +149,16 @@ class HabilidadAdmin(admin.ModelAdmin):
 # ============================================
 @admin.register(Certificado)
 class CertificadoAdmin(admin.ModelAdmin):
-    list_display = ('titulo', 'institucion', 'fecha', 'perfil', 'preview_archivo')
+    form = ArchivoConChecksumForm
+
+    class Media:
+        js = ('cv/js/subidas_admin.js',)
+
+    list_display = ('titulo', 'institucion', 'fecha', 'perfil', 'preview_archivo', 'estado_imagen')
     search_fields = ('titulo', 'institucion')
-    list_filter = ('fecha', 'perfil')
+    list_filter = ('fecha', 'perfil', 'estado_imagen')
     date_hierarchy = 'fecha'
+    actions = ('regenerar_miniatura',)
     
     fieldsets = (
         ('📜 Información del Certificado', {
@@ -143,6 +171,10 @@ class CertificadoAdmin(admin.ModelAdmin):
             'fields': ('archivo',),
             'description': '⚠️ IMPORTANTE: El archivo se guarda en Azure: media/certificados/'
         }),
+        ('🖼️ Miniatura', {
+            'fields': ('preview_imagen', 'estado_imagen', 'intentos_imagen', 'error_imagen'),
+            'description': 'Se genera en segundo plano a partir del PDF'
+        }),
     )
     
     def preview_archivo(self, obj):
@@ -167,61 +199,31 @@ class CertificadoAdmin(admin.ModelAdmin):
     
     preview_archivo.short_description = 'Vista Previa'
 
-    readonly_fields = ("preview_imagen",)
+    readonly_fields = ("preview_imagen", "estado_imagen", "intentos_imagen", "error_imagen")
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
 
-        if (
-            obj.archivo
-            and obj.archivo.name.lower().endswith(".pdf")
-            and not obj.imagen
-        ):
-            self._generar_imagen_desde_pdf(obj)
-
-    def _generar_imagen_desde_pdf(self, obj):
-        # 1️⃣ Descargar PDF desde Azure
-        response = requests.get(obj.archivo.url)
-        response.raise_for_status()
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(response.content)
-            tmp_path = tmp.name
-
-        try:
-            # 2️⃣ Convertir PDF → imagen
-            pages = convert_from_path(
-                tmp_path,
-                dpi=200,
-                first_page=1,
-                last_page=1
-            )
-
-            buffer = io.BytesIO()
-            pages[0].save(buffer, format="JPEG", quality=90)
-            buffer.seek(0)
-
-            nombre = os.path.splitext(
-                os.path.basename(obj.archivo.name)
-            )[0]
-
-            # 3️⃣ Guardar imagen en Azure
-            obj.imagen.save(
-                f"{nombre}.jpg",
-                ContentFile(buffer.read()),
-                save=False
-            )
-
-            obj.save(update_fields=["imagen"])
+        # La conversión PDF → imagen la hace `manage.py procesar_miniaturas`
+        if necesita_miniatura(obj):
+            encolar_miniatura(obj)
 
-        finally:
-            os.remove(tmp_path)
+    @admin.action(description='🔄 Regenerar miniatura desde el PDF')
+    def regenerar_miniatura(self, request, queryset):
+        encolados = 0
+        for obj in queryset:
+            if obj.archivo and obj.archivo.name.lower().endswith('.pdf'):
+                if obj.imagen:
+                    obj.imagen.delete(save=True)
+                encolar_miniatura(obj)
+                encolados += 1
+        self.message_user(request, f'{encolados} certificado(s) en cola.')
 
     def preview_imagen(self, obj):
         if obj.imagen:
             return format_html(
                 '<img src="{}" style="max-width:120px;border-radius:8px;" />',
-                obj.imagen.url
+                url_mas_pequena(obj, 'imagen')
             )
         return "—"
 
@@ -264,6 +266,11 @@ class ReferenciaAdmin(admin.ModelAdmin):
 # ============================================
 @admin.register(Reconocimiento)
 class ReconocimientoAdmin(admin.ModelAdmin):
+    form = ArchivoConChecksumForm
+
+    class Media:
+        js = ('cv/js/subidas_admin.js',)
+
     list_display = ('titulo', 'otorgado_por', 'fecha', 'perfil')
     search_fields = ('titulo', 'otorgado_por')
     list_filter = ('fecha',)
@@ -296,7 +303,7 @@ class GarageAdmin(admin.ModelAdmin):
                 return format_html(
                     '<a href="{}" target="_blank">'
                     '<img src="{}" style="max-width: 100px; max-height: 50px; border-radius: 5px;"/></a>',
-                    obj.imagen.url, obj.imagen.url
+                    obj.imagen.url, url_mas_pequena(obj, 'imagen')
                 )
             except Exception:
                 pass
@@ -1,4 +1,7 @@
-from django.apps import AppConfig
-
-class CvConfig (AppConfig):
-    name = 'cv'
+from django.apps import AppConfig
+
+class CvConfig (AppConfig):
+    name = 'cv'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,209 @@
+import hashlib
+import secrets
+import time
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import storages
+from django.utils import timezone
+
+
+# ============================================
+# CACHE DE LA PÁGINA /cv/ (VERSIONADO)
+# ============================================
+
+CLAVE_VERSION = 'cv:version'
+CLAVE_MODIFICADO = 'cv:modificado'
+CLAVE_PAGINA = 'cv:pagina'
+
+CARPETA_PLANTILLAS = Path(__file__).parent / 'templates'
+
+
+def leer_manifest():
+    """Manifest de collectstatic ('' sin él, p. ej. con DEBUG o en tests)"""
+    leer = getattr(storages['staticfiles'], 'read_manifest', None)
+    return (leer() if leer is not None else None) or ''
+
+
+def calcular_huella(carpeta=CARPETA_PLANTILLAS, version=None, manifest=None):
+    """
+    Hash del contenido de las plantillas, del manifest de estáticos y de
+    settings.VERSION_DESPLIEGUE. No se usa la fecha de los archivos: un
+    checkout, una imagen nueva o un rollback pueden cambiar las plantillas
+    sin mover la fecha (o al revés).
+    """
+    huella = hashlib.sha256((settings.VERSION_DESPLIEGUE if version is None else version).encode())
+    # El HTML cacheado lleva el CSS crítico en línea y las URLs con hash de
+    # los bundles: un collectstatic que los cambie también lo invalida
+    huella.update((leer_manifest() if manifest is None else manifest).encode() + b'\0')
+    for ruta in sorted(carpeta.rglob('*.html')):
+        huella.update(ruta.relative_to(carpeta).as_posix().encode() + b'\0')
+        huella.update(ruta.read_bytes() + b'\0')
+    return huella.hexdigest()[:16]
+
+
+# Cambia en cada despliegue que toque las plantillas o los estáticos, así
+# una página cacheada con el HTML anterior no se vuelve a servir
+HUELLA_PLANTILLAS = calcular_huella()
+
+# Last-Modified sí necesita una fecha: la plantilla más reciente
+MODIFICADO_PLANTILLAS = datetime.fromtimestamp(
+    max(ruta.stat().st_mtime for ruta in CARPETA_PLANTILLAS.rglob('*.html')), tz=dt_timezone.utc,
+).replace(microsecond=0)
+
+EstadoCache = namedtuple('EstadoCache', ['version', 'modificado', 'contenido'])
+
+
+def version_actual():
+    """Versión del contenido del CV; se inicializa con la hora si no existe"""
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        # Arrancar desde la hora evita reutilizar una versión ya usada
+        # si el cache se vació o se expulsó la clave
+        cache.add(CLAVE_VERSION, nueva_version(), None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def modificado_actual():
+    """Fecha del último cambio en los modelos del CV"""
+    modificado = cache.get(CLAVE_MODIFICADO)
+    if modificado is None:
+        from .services import ultima_modificacion_bd
+        cache.add(CLAVE_MODIFICADO, ultima_modificacion_bd() or timezone.now(), None)
+        modificado = cache.get(CLAVE_MODIFICADO)
+    return modificado
+
+
+def incrementar_version(modelo=None):
+    """
+    Invalida todas las páginas cacheadas del CV y, si se indica el modelo
+    (su model_name), solo los fragmentos de las secciones que dependen de él.
+    """
+    claves = [CLAVE_VERSION]
+    if modelo is not None:
+        claves.append(clave_version_modelo(modelo))
+    # Un valor nuevo en vez de incr(): en FileBasedCache incr() es leer+escribir
+    # sin lock, y dos guardados a la vez en workers distintos podían dejar la
+    # misma versión (y una página con solo uno de los cambios)
+    cache.set_many({clave: nueva_version() for clave in claves}, None)
+    cache.set(CLAVE_MODIFICADO, timezone.now(), None)
+
+
+def nueva_version():
+    """Entero que no se repite entre procesos: la hora en ns y algo de azar"""
+    return time.time_ns() * 1000 + secrets.randbelow(1000)
+
+
+def clave_pagina(slug=None):
+    return f'{CLAVE_PAGINA}:{slug}' if slug else CLAVE_PAGINA
+
+
+def leer_estado(request, slug=None):
+    """
+    Versión, fecha de modificación y página cacheada con una sola ida al
+    cache. Se guarda en el request para que los validadores HTTP y la vista
+    no repitan la lectura.
+    """
+    estado = getattr(request, '_cv_estado', None)
+    if estado is not None:
+        return estado
+
+    clave = clave_pagina(slug)
+    valores = cache.get_many([CLAVE_VERSION, CLAVE_MODIFICADO, clave])
+    version = valores.get(CLAVE_VERSION)
+    modificado = valores.get(CLAVE_MODIFICADO)
+    guardada = valores.get(clave)
+
+    if version is None:
+        version = version_actual()
+    if modificado is None:
+        modificado = modificado_actual()
+
+    contenido = None
+    if guardada is not None and guardada[0] == (version, HUELLA_PLANTILLAS):
+        contenido = guardada[1]
+
+    estado = request._cv_estado = EstadoCache(version, modificado, contenido)
+    return estado
+
+
+def guardar_pagina(version, contenido, slug=None):
+    cache.set(clave_pagina(slug), ((version, HUELLA_PLANTILLAS), contenido), settings.CV_CACHE_TIMEOUT)
+
+
+def clave_compresion(version, slug=None):
+    """Prefijo de la página ya comprimida (cv.middleware agrega ':br' o ':gzip')"""
+    return f'{clave_pagina(slug)}:{version}:{HUELLA_PLANTILLAS}'
+
+
+# ============================================
+# FRAGMENTOS POR SECCIÓN (VERSIÓN POR MODELO)
+# ============================================
+
+CLAVE_VERSION_MODELO = 'cv:version:modelo'
+CLAVE_FRAGMENTO = 'cv:fragmento'
+
+# model_name de los modelos con contador propio (los de cv.signals.MODELOS_CV)
+MODELOS_VERSIONADOS = (
+    'perfil', 'educacion', 'experiencia', 'habilidad',
+    'certificado', 'reconocimiento', 'proyecto', 'garage',
+)
+
+
+def clave_version_modelo(modelo):
+    return f'{CLAVE_VERSION_MODELO}:{modelo}'
+
+
+def versiones_modelos():
+    """
+    {model_name: versión} con una sola ida al cache. Igual que
+    version_actual(), un contador ausente arranca desde la hora.
+    """
+    claves = {clave_version_modelo(modelo): modelo for modelo in MODELOS_VERSIONADOS}
+    valores = cache.get_many(list(claves))
+    faltantes = {clave: nueva_version() for clave in claves if clave not in valores}
+    if faltantes:
+        for clave, valor in faltantes.items():
+            cache.add(clave, valor, None)
+        valores.update(cache.get_many(list(faltantes)))
+    return {modelo: valores[clave] for clave, modelo in claves.items()}
+
+
+def clave_fragmento(nombre, perfil_pk, versiones):
+    # Las versiones van en la clave: al editar un modelo solo cambian las
+    # claves de sus secciones y las viejas expiran solas
+    return f'{CLAVE_FRAGMENTO}:{nombre}:{perfil_pk or "-"}:{"-".join(map(str, versiones))}:{HUELLA_PLANTILLAS}'
+
+
+# ============================================
+# CACHE DEL PDF (POR VERSIÓN Y SECCIONES)
+# ============================================
+
+def clave_pdf(version, slug, secciones):
+    # La versión va en la clave: al editar el CV las entradas viejas
+    # simplemente dejan de pedirse y expiran solas
+    return f'cv:pdf:{slug or "-"}:{version}:{HUELLA_PLANTILLAS}:{",".join(secciones)}'
+
+
+def leer_pdf(version, slug, secciones):
+    return cache.get(clave_pdf(version, slug, secciones))
+
+
+def guardar_pdf(version, slug, secciones, contenido):
+    cache.set(clave_pdf(version, slug, secciones), contenido, settings.CV_CACHE_TIMEOUT)
+
+
+# ============================================
+# VALIDADORES HTTP (ETag / Last-Modified)
+# ============================================
+
+def etag_cv(request, slug=None):
+    return f'{leer_estado(request, slug).version}-{HUELLA_PLANTILLAS}'
+
+
+def ultima_modificacion_cv(request, slug=None):
+    return max(leer_estado(request, slug).modificado, MODIFICADO_PLANTILLAS)
@@ -0,0 +1,120 @@
+import logging
+import os
+import time
+
+from django.core.files.storage import storages
+from django.db import connections
+from django.http import HttpRequest
+from django.template import engines
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# CALENTAMIENTO AL ARRANCAR EL PROCESO
+# ============================================
+
+# Plantillas públicas: se compilan antes del primer request
+PLANTILLAS = ('cv/home.html', 'cv/cv.html', 'cv/cv_pdf.html')
+
+
+def cargador_cacheado():
+    """El cached.Loader configurado en TEMPLATES (None si no hay)"""
+    for cargador in engines['django'].engine.template_loaders:
+        if hasattr(cargador, 'get_template_cache'):
+            return cargador
+    return None
+
+
+def plantilla_compilada(nombre):
+    cargador = cargador_cacheado()
+    return cargador is not None and nombre in cargador.get_template_cache
+
+
+def calentar_plantillas():
+    """Compila PLANTILLAS en el cache del loader; devuelve {nombre: ms}"""
+    tiempos = {}
+    for nombre in PLANTILLAS:
+        inicio = time.perf_counter()
+        get_template(nombre)
+        tiempos[nombre] = (time.perf_counter() - inicio) * 1000
+    logger.info('Plantillas compiladas: %s', ', '.join(f'{n} {ms:.1f} ms' for n, ms in tiempos.items()))
+    return tiempos
+
+
+def cargar_urls():
+    """Importa el URLconf completo (vistas, admin) y llena el cache de reverse()"""
+    get_resolver().url_patterns
+    reverse('cv')
+
+
+def abrir_storages():
+    """Lee el manifest de estáticos y crea el storage espejo de media y su cliente"""
+    for alias in ('staticfiles', 'default'):
+        storage = storages[alias]
+        # AlmacenamientoEspejo crea el remoto al primer uso, y AzureStorage su cliente
+        for remoto in (storage, getattr(storage, 'espejo', None)):
+            if remoto is not None:
+                getattr(remoto, 'client', None)
+
+
+def abrir_conexiones():
+    for conexion in connections.all():
+        conexion.ensure_connection()
+
+
+def llenar_cache_cv():
+    """Renderiza /cv/ una vez para que quede la página (y sus fragmentos) en el cache"""
+    from .views import cv_view
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = reverse('cv')
+    cv_view(request)
+
+
+PASOS = (
+    ('urls', cargar_urls),
+    ('plantillas', calentar_plantillas),
+    ('storages', abrir_storages),
+    ('base_de_datos', abrir_conexiones),
+    ('pagina_cv', llenar_cache_cv),
+)
+
+# Estado del proceso actual; lo publica cv.views.salud
+ESTADO = {'listo': False, 'pid': None, 'pasos': {}, 'errores': {}}
+
+
+def calentar(pasos=None):
+    """
+    Deja el proceso listo para atender: corre PASOS (o solo los nombrados)
+    y marca ESTADO['listo'] solo si ninguno falló. Un paso que falla se
+    registra pero no detiene el arranque: el worker atiende igual, en frío,
+    y /salud/ responde 503 con los errores.
+    """
+    ESTADO['listo'] = False
+    for nombre, paso in PASOS:
+        if pasos is not None and nombre not in pasos:
+            continue
+        inicio = time.perf_counter()
+        try:
+            paso()
+        except Exception as error:
+            ESTADO['errores'][nombre] = repr(error)
+            logger.warning('Calentamiento: falló %s', nombre, exc_info=True)
+        else:
+            ESTADO['errores'].pop(nombre, None)
+        ESTADO['pasos'][nombre] = round((time.perf_counter() - inicio) * 1000, 1)
+
+    ESTADO['pid'] = os.getpid()
+    ESTADO['listo'] = not ESTADO['errores']
+    if ESTADO['listo']:
+        logger.info('Proceso %s calentado: %s', ESTADO['pid'], ESTADO['pasos'])
+    return ESTADO
+
+
+def estado_calentamiento():
+    # Tras un fork el estado heredado es del master, no de este worker
+    return {**ESTADO, 'listo': ESTADO['listo'] and ESTADO['pid'] == os.getpid()}
@@ -0,0 +1,213 @@
+import logging
+import re
+from pathlib import Path
+
+from django.contrib.staticfiles import finders
+from django.core.files.base import ContentFile
+from django.template.loader import get_template
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+try:
+    import rcssmin
+except ImportError:  # pragma: no cover - opcional en desarrollo
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:  # pragma: no cover - opcional en desarrollo
+    rjsmin = None
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# ESTÁTICOS PROPIOS: MINIFICADOS + CSS CRÍTICO
+# ============================================
+
+# Se minifican al hacer collectstatic (los de vendor ya vienen minificados)
+CARPETAS_MINIFICABLES = ('cv/css/', 'cv/js/')
+
+# CSS crítico → hojas de las que sale, la plantilla y el JS que la animan.
+# Entra toda regla cuyo selector solo usa clases, ids y etiquetas que
+# aparecen antes de MARCADOR_PLIEGUE en la plantilla (o en cadenas del JS).
+CRITICOS = {
+    'cv/css/cv.critico.css': {
+        'hojas': ['cv/vendor/bootstrap/bootstrap.min.css', 'cv/css/cv.css'],
+        'plantilla': 'cv/cv.html',
+        'scripts': ['cv/js/cv.js'],
+    },
+}
+MARCADOR_PLIEGUE = '{# critico:fin'
+
+
+def minificar(nombre, contenido):
+    if nombre.endswith('.css') and rcssmin is not None:
+        return rcssmin.cssmin(contenido)
+    if nombre.endswith('.js') and rjsmin is not None:
+        return rjsmin.jsmin(contenido)
+    return contenido
+
+
+# ---------- extracción del CSS crítico ----------
+
+def _sin_comentarios(css):
+    return re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+
+
+def _bloques(css):
+    """Divide CSS en sentencias de primer nivel: 'sel{...}' o '@charset ...;'"""
+    profundidad = inicio = 0
+    for i, caracter in enumerate(css):
+        if caracter == '{':
+            profundidad += 1
+        elif caracter == '}':
+            profundidad -= 1
+            if profundidad == 0:
+                yield css[inicio:i + 1].strip()
+                inicio = i + 1
+        elif caracter == ';' and profundidad == 0:
+            yield css[inicio:i + 1].strip()
+            inicio = i + 1
+
+
+def _tokens_presentes(html, scripts):
+    clases = set()
+    for valor in re.findall(r'class="([^"]*)"', html):
+        clases.update(c for c in valor.split() if '{' not in c and '}' not in c)
+    # Clases que el JS agrega (modo oscuro, iconos flotantes, 'active'...)
+    for script in scripts:
+        for _, literal in re.findall(r'([\'"`])(.*?)\1', script):
+            clases.update(re.findall(r'[A-Za-z][\w-]*', literal))
+    ids = set(re.findall(r'id="([\w-]+)"', html))
+    etiquetas = set(re.findall(r'<([a-z][a-z0-9]*)', html)) | {'html', 'body'}
+    atributos = set(re.findall(r'\s([a-z][\w-]*)=', html))
+    return clases, ids, etiquetas, atributos
+
+
+# Estados que no existen en el primer pintado
+INTERACTIVOS = re.compile(r':(hover|focus|focus-visible|focus-within|active|visited)\b|::-webkit-scrollbar')
+
+
+def _selector_presente(selector, clases, ids, etiquetas, atributos):
+    if INTERACTIVOS.search(selector):
+        return False
+    if not all(a in atributos for a in re.findall(r'\[\s*([\w-]+)', selector)):
+        return False
+    selector = re.sub(r'\[[^\]]*\]', '', selector)
+    selector = re.sub(r'::?[\w-]+(\([^)]*\))?', '', selector)
+    if not selector.strip():
+        return False  # solo pseudo-elementos del navegador o atributos
+    if not all(c in clases for c in re.findall(r'\.(-?[_a-zA-Z][\w-]*)', selector)):
+        return False
+    if not all(i in ids for i in re.findall(r'#([\w-]+)', selector)):
+        return False
+    compuestos = re.split(r'[\s>+~]+', selector.strip())
+    for compuesto in compuestos:
+        etiqueta = re.match(r'[a-zA-Z][\w-]*', compuesto)
+        if etiqueta and etiqueta.group().lower() not in etiquetas:
+            return False
+    return True
+
+
+def _reglas_criticas(css, presentes):
+    criticas = []
+    for bloque in _bloques(css):
+        if '{' not in bloque:
+            continue  # @charset, @import
+        preludio, cuerpo = bloque.split('{', 1)
+        preludio, cuerpo = preludio.strip(), cuerpo[:-1]
+
+        if preludio.startswith(('@media', '@supports')):
+            if preludio.startswith('@media') and 'print' in preludio and 'screen' not in preludio:
+                continue
+            internas = _reglas_criticas(cuerpo, presentes)
+            if internas:
+                criticas.append(f'{preludio}{{{"".join(internas)}}}')
+        elif preludio.startswith('@font-face'):
+            criticas.append(bloque)
+        elif preludio.startswith('@'):
+            continue  # @keyframes se agregan después si algo las usa
+        elif preludio.startswith(':root') or any(
+            _selector_presente(s, *presentes) for s in preludio.split(',')
+        ):
+            criticas.append(bloque)
+    return criticas
+
+
+def _animaciones_usadas(css, reglas):
+    texto = ''.join(reglas)
+    for bloque in _bloques(css):
+        coincide = re.match(r'@(?:-webkit-)?keyframes\s+([\w-]+)', bloque)
+        if coincide and re.search(rf'animation[^;}}]*\b{re.escape(coincide.group(1))}\b', texto):
+            yield bloque
+
+
+def extraer_critico(hojas, html, scripts=()):
+    """CSS de las hojas que afecta al HTML dado (sin @media print)"""
+    presentes = _tokens_presentes(html, scripts)
+    reglas = []
+    for css in hojas:
+        css = _sin_comentarios(css)
+        propias = _reglas_criticas(css, presentes)
+        reglas.extend(propias)
+        reglas.extend(_animaciones_usadas(css, propias))
+    return '\n'.join(reglas)
+
+
+def primer_pantallazo(plantilla):
+    """HTML de la plantilla desde <body hasta el marcador del pliegue"""
+    with open(get_template(plantilla).origin.name, encoding='utf-8') as archivo:
+        fuente = archivo.read()
+    inicio = fuente.find('<body')
+    fin = fuente.find(MARCADOR_PLIEGUE)
+    return fuente[inicio:fin if fin != -1 else None]
+
+
+def generar_critico(nombre, leer):
+    """leer(ruta_estatica) → texto; así sirve tanto en collectstatic como en tests"""
+    config = CRITICOS[nombre]
+    return minificar(nombre, extraer_critico(
+        [leer(hoja) for hoja in config['hojas']],
+        primer_pantallazo(config['plantilla']),
+        [leer(script) for script in config.get('scripts', ())],
+    ))
+
+
+def leer_con_finders(ruta):
+    return Path(finders.find(ruta)).read_text(encoding='utf-8')
+
+
+# ---------- storage de collectstatic ----------
+
+class EstaticosCV(CompressedManifestStaticFilesStorage):
+    """
+    Antes de ponerles hash y comprimirlos (gzip/Brotli):
+    - minifica los CSS/JS propios de cv/css y cv/js;
+    - genera cada CSS crítico de CRITICOS para que cv_estaticos lo inserte
+      en línea.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for ruta in list(paths):
+                if ruta.startswith(CARPETAS_MINIFICABLES) and '.min.' not in ruta and ruta.endswith(('.css', '.js')):
+                    self._reescribir(ruta, minificar(ruta, self._leer(ruta)))
+                    paths[ruta] = (self, ruta)
+
+            for nombre in CRITICOS:
+                contenido = generar_critico(nombre, self._leer)
+                self._reescribir(nombre, contenido)
+                paths[nombre] = (self, nombre)
+                logger.info('CSS crítico %s: %d bytes', nombre, len(contenido))
+
+        yield from super().post_process(paths, dry_run, **options)
+
+    def _leer(self, ruta):
+        with self.open(ruta) as archivo:
+            return archivo.read().decode('utf-8')
+
+    def _reescribir(self, ruta, contenido):
+        if self.exists(ruta):
+            self.delete(ruta)
+        self._save(ruta, ContentFile(contenido.encode('utf-8')))
@@ -0,0 +1,195 @@
+import io
+import logging
+import os
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .cache import incrementar_version
+from .models import TareaVariantes
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# VARIANTES DE IMAGEN (VARIOS ANCHOS Y FORMATOS)
+# ============================================
+
+# Anchos generados: miniatura del admin, tarjetas y pantallas de alta densidad
+ANCHOS = (160, 480, 960)
+
+# (extensión, formato de Pillow, tipo MIME, opciones). Del más liviano al
+# respaldo universal; AVIF solo si Pillow se compiló con libavif.
+FORMATOS = [
+    ('avif', 'AVIF', 'image/avif', {'quality': 50}),
+    ('webp', 'WEBP', 'image/webp', {'quality': 75, 'method': 6}),
+    ('jpg', 'JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+]
+
+# Modelo → (campo de imagen, campo JSON con las variantes)
+CAMPOS_CON_VARIANTES = {
+    'Perfil': ('foto', 'foto_variantes'),
+    'Certificado': ('imagen', 'imagen_variantes'),
+    'Garage': ('imagen', 'imagen_variantes'),
+}
+
+
+def formatos_disponibles():
+    return [f for f in FORMATOS if f[1] != 'AVIF' or features.check('avif')]
+
+
+def _nombre_variante(nombre, ancho, extension):
+    base, _ = os.path.splitext(nombre)
+    return f'{base}__{ancho}w.{extension}'
+
+
+def borrar_variantes(storage, variantes):
+    for nombres in variantes.get('formatos', {}).values():
+        for nombre in nombres.values():
+            storage.delete(nombre)
+
+
+def generar_variantes(campo):
+    """
+    Genera cada ancho en cada formato disponible junto al archivo original.
+    Devuelve el dict que se guarda en <campo>_variantes:
+    {'origen': nombre, 'formatos': {'webp': {'160': nombre, ...}, ...}}
+    """
+    with campo.open('rb') as archivo:
+        original = ImageOps.exif_transpose(Image.open(archivo))
+        original.load()
+
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'A' in original.getbands() else 'RGB')
+
+    # Nunca se agranda: los anchos mayores al original se reemplazan por él
+    anchos = sorted({min(ancho, original.width) for ancho in ANCHOS})
+
+    formatos = {}
+    for extension, formato, _, opciones in formatos_disponibles():
+        formatos[extension] = {}
+        for ancho in anchos:
+            imagen = original
+            if ancho < original.width:
+                alto = round(original.height * ancho / original.width)
+                imagen = original.resize((ancho, alto), Image.LANCZOS)
+            if formato == 'JPEG' and imagen.mode == 'RGBA':
+                imagen = imagen.convert('RGB')
+
+            buffer = io.BytesIO()
+            imagen.save(buffer, format=formato, **opciones)
+            nombre = campo.storage.save(
+                _nombre_variante(campo.name, ancho, extension),
+                ContentFile(buffer.getvalue()),
+            )
+            formatos[extension][str(ancho)] = nombre
+
+    return {'origen': campo.name, 'formatos': formatos}
+
+
+def variantes_desactualizadas(instancia):
+    """Si la imagen cambió desde que se generaron sus variantes"""
+    campo_imagen, campo_variantes = CAMPOS_CON_VARIANTES[type(instancia).__name__]
+    variantes = getattr(instancia, campo_variantes) or {}
+    return (getattr(instancia, campo_imagen).name or None) != variantes.get('origen')
+
+
+def actualizar_variantes(instancia):
+    """
+    Regenera las variantes si la imagen cambió desde la última vez.
+    Devuelve True si hubo cambios. Un error al procesar la imagen no
+    detiene la cola: la plantilla usa el original como respaldo.
+    """
+    if not variantes_desactualizadas(instancia):
+        return False
+
+    campo_imagen, campo_variantes = CAMPOS_CON_VARIANTES[type(instancia).__name__]
+    campo = getattr(instancia, campo_imagen)
+    variantes = getattr(instancia, campo_variantes) or {}
+
+    borrar_variantes(campo.storage, variantes)
+    nuevas = {}
+    if campo:
+        try:
+            nuevas = generar_variantes(campo)
+        except Exception:
+            logger.exception('No se pudieron generar variantes de %s', campo.name)
+
+    type(instancia).objects.filter(pk=instancia.pk).update(**{campo_variantes: nuevas})
+    setattr(instancia, campo_variantes, nuevas)
+    return True
+
+
+# ============================================
+# COLA DE VARIANTES (FUERA DEL GUARDADO)
+# ============================================
+
+# Tiempo que un worker reserva una tarea; si muere, otra la retoma al vencer
+RESERVA_VARIANTES = timedelta(minutes=10)
+
+
+def encolar_variantes(instancia):
+    """
+    Anota la imagen para `procesar_variantes`; no codifica nada. Con AVIF
+    y WebP en tres anchos el guardado en el admin tardaba segundos.
+    """
+    TareaVariantes.objects.update_or_create(
+        modelo=type(instancia).__name__, objeto_id=instancia.pk,
+        defaults={'reservada_hasta': None},
+    )
+
+
+def reclamar_variantes():
+    """
+    Reserva la tarea más vieja con un UPDATE condicional (como
+    miniaturas.reclamar) y la devuelve, o None si no queda ninguna libre.
+    """
+    ahora = timezone.now()
+    libres = TareaVariantes.objects.filter(Q(reservada_hasta__isnull=True) | Q(reservada_hasta__lte=ahora))
+    for tarea in libres.order_by('pedida')[:10]:
+        if libres.filter(pk=tarea.pk, pedida=tarea.pedida).update(reservada_hasta=ahora + RESERVA_VARIANTES):
+            return tarea
+    return None
+
+
+def procesar_variantes(tarea):
+    """
+    Genera las variantes de una tarea ya reservada. Si cambiaron, invalida
+    las páginas y la sección del modelo: hasta acá se servía el original.
+    Devuelve True si hubo cambios.
+    """
+    modelo = apps.get_model('cv', tarea.modelo)
+    instancia = modelo.objects.filter(pk=tarea.objeto_id).first()
+    cambio = instancia is not None and actualizar_variantes(instancia)
+    # Si se volvió a pedir mientras tanto, queda para la próxima vuelta
+    TareaVariantes.objects.filter(pk=tarea.pk, pedida=tarea.pedida).delete()
+    if cambio:
+        incrementar_version(modelo._meta.model_name)
+    return cambio
+
+
+# ============================================
+# CONSULTA DESDE PLANTILLAS Y ADMIN
+# ============================================
+
+def variantes_de(instancia, campo_imagen):
+    campo_variantes = f'{campo_imagen}_variantes'
+    variantes = getattr(instancia, campo_variantes, None) or {}
+    campo = getattr(instancia, campo_imagen)
+    if not campo or variantes.get('origen') != campo.name:
+        return {}
+    return variantes.get('formatos', {})
+
+
+def url_mas_pequena(instancia, campo_imagen):
+    """URL de la variante más chica (JPEG) o del original si no hay variantes"""
+    campo = getattr(instancia, campo_imagen)
+    jpg = variantes_de(instancia, campo_imagen).get('jpg')
+    if jpg:
+        ancho = min(jpg, key=int)
+        return campo.storage.url(jpg[ancho])
+    return campo.url
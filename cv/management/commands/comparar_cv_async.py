@@ -0,0 +1,103 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.utils import CursorWrapper
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from .medir_render_cv import percentil
+
+
+def _latencia_por_consulta(segundos):
+    """Simula una base remota: cada consulta espera `segundos` antes de ejecutarse"""
+    ejecutar = CursorWrapper.execute
+
+    def ejecutar_lento(cursor, *args, **kwargs):
+        time.sleep(segundos)
+        return ejecutar(cursor, *args, **kwargs)
+    return mock.patch.object(CursorWrapper, 'execute', ejecutar_lento)
+
+
+def carga_sync(url, peticiones, concurrencia):
+    def pedir(_):
+        inicio = time.perf_counter()
+        response = Client().get(url)
+        return response.status_code, (time.perf_counter() - inicio) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrencia) as hilos:
+        return list(hilos.map(pedir, range(peticiones)))
+
+
+async def carga_async(url, peticiones, concurrencia):
+    limite = asyncio.Semaphore(concurrencia)
+    cliente = AsyncClient()
+
+    async def pedir():
+        async with limite:
+            inicio = time.perf_counter()
+            response = await cliente.get(url)
+            return response.status_code, (time.perf_counter() - inicio) * 1000
+
+    return await asyncio.gather(*(pedir() for _ in range(peticiones)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara /cv/ (vista sync en hilos) con /async/cv/ (vista async en un '
+        'event loop) bajo la misma carga, dentro del proceso y sin servidor'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slug', help='Perfil a pedir (por defecto el de /cv/)')
+        parser.add_argument('--peticiones', type=int, default=200)
+        parser.add_argument('--concurrencia', type=int, default=20)
+        parser.add_argument(
+            '--latencia-ms', type=float, default=0,
+            help='Espera artificial por consulta SQL (simula una base remota)',
+        )
+        parser.add_argument(
+            '--con-cache', action='store_true',
+            help='Deja actuar al cache de página y de fragmentos (por defecto cada petición renderiza)',
+        )
+
+    def handle(self, *args, **options):
+        slug = options['slug']
+        urls = {
+            'sync': reverse('cv_perfil', args=[slug]) if slug else reverse('cv'),
+            'async': reverse('cv_perfil_async', args=[slug]) if slug else reverse('cv_async'),
+        }
+        peticiones, concurrencia = options['peticiones'], options['concurrencia']
+
+        with ExitStack() as parches:
+            if not options['con_cache']:
+                parches.enter_context(mock.patch('cv.views.guardar_pagina'))
+                parches.enter_context(mock.patch('cv.views.versiones_modelos', return_value=None))
+            if options['latencia_ms']:
+                parches.enter_context(_latencia_por_consulta(options['latencia_ms'] / 1000))
+
+            self.stdout.write(
+                f'{peticiones} peticiones, concurrencia {concurrencia}, '
+                f'latencia SQL {options["latencia_ms"]:.0f} ms, cache {"sí" if options["con_cache"] else "no"}'
+            )
+            self.stdout.write(f'{"Camino":<7} {"req/s":>8} {"p50 ms":>9} {"p99 ms":>9}')
+            for camino, url in urls.items():
+                inicio = time.perf_counter()
+                if camino == 'sync':
+                    resultados = carga_sync(url, peticiones, concurrencia)
+                else:
+                    resultados = asyncio.run(carga_async(url, peticiones, concurrencia))
+                total = time.perf_counter() - inicio
+
+                fallidas = [codigo for codigo, _ in resultados if codigo != 200]
+                if fallidas:
+                    raise CommandError(f'{url}: {len(fallidas)} respuestas con error ({fallidas[0]})')
+                tiempos = [ms for _, ms in resultados]
+                self.stdout.write(
+                    f'{camino:<7} {peticiones / total:>8.1f} '
+                    f'{statistics.median(tiempos):>9.2f} {percentil(tiempos, 99):>9.2f}'
+                )
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from cv.services import cargar_contexto_cv
+
+# Pasos del plan de SQLite que indican un ordenamiento sin índice.
+# 'SCAN' no se marca: /cv/ sin slug lee el primer rowid con un SCAN + LIMIT 1
+SENALES_DE_ALERTA = ('USE TEMP B-TREE',)
+
+
+class Command(BaseCommand):
+    help = 'Muestra EXPLAIN QUERY PLAN de cada consulta que ejecuta cv_view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slug', help='Perfil a explicar (por defecto el primero)')
+        parser.add_argument(
+            '--estricto',
+            action='store_true',
+            help='Termina con error si algún plan ordena en un B-tree temporal',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN solo está disponible en SQLite.')
+
+        consultas = []
+
+        def capturar(execute, sql, params, many, context):
+            consultas.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capturar):
+            cargar_contexto_cv(options['slug'])
+
+        alertas = 0
+        for numero, (sql, params) in enumerate(consultas, start=1):
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n[{numero}] {sql}'))
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                for fila in cursor.fetchall():
+                    detalle = fila[-1]
+                    if any(senal in detalle for senal in SENALES_DE_ALERTA):
+                        alertas += 1
+                        self.stdout.write(self.style.WARNING(f'    {detalle}'))
+                    else:
+                        self.stdout.write(f'    {detalle}')
+
+        resumen = f'\n{len(consultas)} consultas, {alertas} ordenamientos sin índice'
+        if alertas and options['estricto']:
+            raise CommandError(resumen.strip())
+        self.stdout.write(self.style.SUCCESS(resumen) if not alertas else self.style.WARNING(resumen))
@@ -0,0 +1,173 @@
+import os
+from datetime import timedelta
+from itertools import islice
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from django.utils import timezone
+
+from cv.imagenes import CAMPOS_CON_VARIANTES
+from cv.subidas import PREFIJO_PARTE, carpeta_subidas
+
+
+def listar_archivos(storage):
+    """
+    Genera (nombre, fecha de modificación) sin cargar el listado completo:
+    Azure pagina list_blobs, el disco se recorre con os.walk.
+    """
+    cliente = getattr(storage, 'client', None)
+    if cliente is not None and hasattr(cliente, 'list_blobs'):
+        for blob in cliente.list_blobs():
+            yield blob.name, blob.last_modified
+        return
+
+    if isinstance(storage, FileSystemStorage):
+        raiz = storage.location
+        for carpeta, subcarpetas, archivos in os.walk(raiz):
+            # Nada oculto: cola del espejo y subidas a medio escribir
+            subcarpetas[:] = sorted(d for d in subcarpetas if not d.startswith('.'))
+            for archivo in sorted(archivos):
+                if archivo.startswith('.'):
+                    continue
+                ruta = os.path.join(carpeta, archivo)
+                nombre = os.path.relpath(ruta, raiz).replace(os.sep, '/')
+                yield nombre, storage.get_modified_time(nombre)
+        return
+
+    # Storage genérico (p. ej. InMemoryStorage en pruebas)
+    pendientes = ['']
+    while pendientes:
+        carpeta = pendientes.pop()
+        subcarpetas, archivos = storage.listdir(carpeta)
+        pendientes.extend(f'{carpeta}{d}/' for d in subcarpetas)
+        for archivo in archivos:
+            nombre = f'{carpeta}{archivo}'
+            yield nombre, storage.get_modified_time(nombre)
+
+
+def partes_abandonadas(raiz, limite):
+    """
+    Rutas de partes .subiendo-* más viejas que `limite`: subidas cortadas o
+    saves que no llegaron al rename porque el proceso murió en el medio.
+    """
+    for carpeta, subcarpetas, archivos in os.walk(raiz):
+        for archivo in archivos:
+            if not archivo.startswith(PREFIJO_PARTE):
+                continue
+            ruta = os.path.join(carpeta, archivo)
+            try:
+                if os.stat(ruta).st_mtime < limite.timestamp():
+                    yield ruta
+            except FileNotFoundError:
+                # La subida terminó (rename) entre el listado y el stat
+                continue
+
+
+def campos_de_archivo():
+    for modelo in apps.get_app_config('cv').get_models():
+        for campo in modelo._meta.concrete_fields:
+            if isinstance(campo, models.FileField):
+                yield modelo, campo.name
+
+
+def nombres_de_variantes():
+    """Las variantes viven en JSON; se juntan una vez (una entrada por variante)"""
+    nombres = set()
+    for nombre_modelo, (_, campo_variantes) in CAMPOS_CON_VARIANTES.items():
+        modelo = apps.get_model('cv', nombre_modelo)
+        for variantes in modelo.objects.exclude(**{campo_variantes: {}}).values_list(campo_variantes, flat=True).iterator():
+            for por_ancho in (variantes or {}).get('formatos', {}).values():
+                nombres.update(por_ancho.values())
+    return nombres
+
+
+def referenciados(lote, campos):
+    """De los nombres del lote, los que alguna fila de la base usa"""
+    usados = set()
+    for modelo, campo in campos:
+        usados.update(
+            modelo.objects.filter(**{f'{campo}__in': lote}).values_list(campo, flat=True)
+        )
+    return usados
+
+
+class Command(BaseCommand):
+    help = 'Borra del storage los archivos media que ninguna fila de la base referencia'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--destino', choices=['local', 'espejo'], default='espejo',
+            help='Qué listado revisar: el disco local o el storage remoto (por defecto el remoto)',
+        )
+        parser.add_argument('--dias-gracia', type=float, default=7, help='No toca archivos más nuevos que esto (por defecto 7 días)')
+        parser.add_argument('--lote', type=int, default=500, help='Nombres por consulta y por borrado (por defecto 500)')
+        parser.add_argument(
+            '--horas-partes', type=float, default=24,
+            help='Edad mínima de una parte .subiendo-* para darla por abandonada (por defecto 24 horas)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Solo muestra lo que se borraría')
+
+    def handle(self, *args, **options):
+        storage = storages['default']
+        if options['destino'] == 'espejo':
+            storage = getattr(storage, 'espejo', None) or storage
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que 0.')
+
+        limite = timezone.now() - timedelta(days=options['dias_gracia'])
+        campos = list(campos_de_archivo())
+        variantes = nombres_de_variantes()
+        pendiente = getattr(storages['default'], 'pendiente', lambda nombre: False)
+
+        revisados = borrados = 0
+        listado = listar_archivos(storage)
+        while True:
+            lote = list(islice(listado, options['lote']))
+            if not lote:
+                break
+            revisados += len(lote)
+
+            candidatos = [
+                nombre for nombre, modificado in lote
+                if modificado < limite and nombre not in variantes and not pendiente(nombre)
+            ]
+            if not candidatos:
+                continue
+            usados = referenciados(candidatos, campos)
+            huerfanos = [n for n in candidatos if n not in usados]
+
+            for nombre in huerfanos:
+                self.stdout.write(f'{"[dry-run] " if options["dry_run"] else ""}{nombre}')
+            if not options['dry_run']:
+                self._borrar(storage, huerfanos)
+            borrados += len(huerfanos)
+
+        accion = 'se borrarían' if options['dry_run'] else 'borrados'
+        self.stdout.write(self.style.SUCCESS(f'{revisados} archivos revisados, {borrados} huérfanos {accion}'))
+
+        # Las partes solo existen en el disco local, se revise el destino que se revise
+        raiz = carpeta_subidas()
+        if raiz is not None:
+            partes = list(partes_abandonadas(raiz, timezone.now() - timedelta(hours=options['horas_partes'])))
+            for ruta in partes:
+                self.stdout.write(f'{"[dry-run] " if options["dry_run"] else ""}{ruta}')
+                if not options['dry_run']:
+                    try:
+                        os.remove(ruta)
+                    except FileNotFoundError:
+                        pass
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(partes)} subidas incompletas {"se borrarían" if options["dry_run"] else "borradas"}'
+            ))
+
+    def _borrar(self, storage, nombres):
+        cliente = getattr(storage, 'client', None)
+        if cliente is not None and hasattr(cliente, 'delete_blobs'):
+            # Azure admite hasta 256 blobs por petición batch
+            for inicio in range(0, len(nombres), 256):
+                cliente.delete_blobs(*nombres[inicio:inicio + 256])
+            return
+        for nombre in nombres:
+            storage.delete(nombre)
@@ -0,0 +1,79 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# "import time:  self [us] | cumulative | imported package"
+LINEA = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# No deben cargarse al arrancar un worker web (solo en miniaturas/PDF)
+PROHIBIDOS = ('pdf2image', 'requests', 'weasyprint')
+
+
+def importar_con_tiempos(modulo):
+    """Importa el módulo en un intérprete nuevo con -X importtime y devuelve [(modulo, self_us, acumulado_us)]"""
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=settings.BASE_DIR, capture_output=True, text=True,
+        env={
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'),
+            # Se mide el import, no el calentamiento (que abre la base y renderiza /cv/)
+            'CALENTAR_AL_ARRANCAR': 'False',
+        },
+    )
+    if resultado.returncode != 0:
+        raise CommandError(f'No se pudo importar {modulo}:\n{resultado.stderr[-2000:]}')
+
+    tiempos = []
+    for linea in resultado.stderr.splitlines():
+        coincide = LINEA.match(linea)
+        if coincide:
+            propio, acumulado, _, nombre = coincide.groups()
+            tiempos.append((nombre, int(propio), int(acumulado)))
+    return tiempos
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide lo que cuesta importar el punto de entrada de los workers '
+        '(python -X importtime) y falla si se cargan dependencias pesadas'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modulo', default='config.wsgi')
+        parser.add_argument('--repeticiones', type=int, default=3)
+        parser.add_argument('--top', type=int, default=15, help='Paquetes más caros a listar')
+        parser.add_argument('--prohibidos', nargs='*', default=list(PROHIBIDOS))
+        parser.add_argument('--maximo-ms', type=float, help='Presupuesto del import completo')
+
+    def handle(self, *args, **options):
+        modulo = options['modulo']
+        corridas = [importar_con_tiempos(modulo) for _ in range(options['repeticiones'])]
+
+        # La corrida mediana (por tiempo total) es la que se reporta
+        totales = [sum(propio for _, propio, _ in corrida) / 1000 for corrida in corridas]
+        mediana = statistics.median_low(totales)
+        corrida = corridas[totales.index(mediana)]
+
+        por_paquete = defaultdict(int)
+        for nombre, propio, _ in corrida:
+            por_paquete[nombre.split('.')[0]] += propio
+
+        self.stdout.write(f'import {modulo}: {mediana:.0f} ms (mediana de {len(totales)}), {len(corrida)} módulos')
+        self.stdout.write(f'{"Paquete":<28} {"ms":>8} {"%":>6}')
+        for paquete, propio in sorted(por_paquete.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'{paquete:<28} {propio / 1000:>8.1f} {propio / 10 / mediana:>6.1f}')
+
+        cargados = {nombre for nombre, _, _ in corrida}
+        encontrados = [p for p in options['prohibidos'] if p in cargados]
+        if encontrados:
+            raise CommandError(f'{modulo} importa dependencias pesadas: {", ".join(encontrados)}')
+        if options['maximo_ms'] is not None and mediana > options['maximo_ms']:
+            raise CommandError(f'import {modulo} tarda {mediana:.0f} ms (máximo {options["maximo_ms"]:.0f} ms)')
+        self.stdout.write(self.style.SUCCESS('Sin dependencias pesadas al arrancar'))
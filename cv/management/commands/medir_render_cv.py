@@ -0,0 +1,149 @@
+import statistics
+import time
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.template.base import Template
+from django.template.loader import render_to_string
+
+from cv.calentamiento import calentar_plantillas, plantilla_compilada
+from cv.models import (
+    Perfil, Educacion, Experiencia, Habilidad,
+    Certificado, Reconocimiento, Proyecto, Garage
+)
+
+# Secciones cortas en todos los escenarios; lo que crece es cursos/proyectos/garage
+FIJOS = 5
+
+
+def contexto_sintetico(cantidad):
+    """Contexto de cv.html con objetos en memoria (no toca la base)"""
+    perfil = Perfil(
+        pk=1, nombre='Perfil Sintético', slug='perfil-sintetico', profesion='Ingeniero de TI',
+        descripcion='Descripción ' * 40, cedula='1234567890', fecha_nacimiento=date(2000, 1, 1),
+        telefono='0999999999', email='perfil@example.com', ubicacion='Manta, Ecuador',
+        linkedin='https://linkedin.com/in/sintetico', github='https://github.com/sintetico',
+        foto='perfil/foto.jpg',
+    )
+    certificados = [
+        Certificado(
+            pk=i, perfil=perfil, titulo=f'Curso {i}', institucion=f'Institución {i % 7}',
+            fecha=date(2010 + i % 15, 1 + i % 12, 1),
+            archivo=f'certificados/curso-{i}.pdf', imagen=f'certificados/img/curso-{i}.jpg',
+        )
+        for i in range(cantidad)
+    ]
+    proyectos = [
+        Proyecto(
+            pk=i, perfil=perfil, nombre=f'Proyecto {i}', descripcion='Detalle del proyecto ' * 10,
+            tecnologias='Python, Django, PostgreSQL', github=f'https://github.com/sintetico/p{i}',
+            demo=f'https://demo.example.com/{i}' if i % 2 else None,
+        )
+        for i in range(cantidad)
+    ]
+    garage = [
+        Garage(
+            pk=i, perfil=perfil, nombreproducto=f'Producto {i}', estadoproducto='Bueno',
+            descripcion='Producto en buen estado ' * 5, valordelbien=Decimal('25.50'),
+            imagen=f'garage/producto-{i}.jpg',
+        )
+        for i in range(cantidad)
+    ]
+    reconocimientos = [
+        Reconocimiento(
+            pk=i, perfil=perfil, titulo=f'Premio {i}', otorgado_por='Organización',
+            fecha=date(2020, 1, 1), archivo=f'reconocimientos/premio-{i}.pdf',
+        )
+        for i in range(FIJOS)
+    ]
+    return {
+        'perfil': perfil,
+        'educacion': [
+            Educacion(pk=i, perfil=perfil, institucion='Universidad', titulo=f'Título {i}',
+                      fecha_inicio=date(2015, 1, 1), fecha_fin=date(2019, 1, 1), descripcion='Estudios')
+            for i in range(FIJOS)
+        ],
+        'experiencia': [
+            Experiencia(pk=i, perfil=perfil, empresa=f'Empresa {i}', cargo='Desarrollador',
+                        fecha_inicio=date(2020, 1, 1), descripcion='Responsabilidades ' * 8)
+            for i in range(FIJOS)
+        ],
+        'habilidades': [
+            Habilidad(pk=i, perfil=perfil, categoria='Backend', nombre=f'Habilidad {i}', nivel=80)
+            for i in range(FIJOS)
+        ],
+        'certificados': certificados,
+        'reconocimientos': reconocimientos,
+        'proyectos': proyectos,
+        'garage': garage,
+        'total_certificados': len(certificados),
+        'total_reconocimientos': len(reconocimientos),
+        'total_proyectos': len(proyectos),
+    }
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, round(p / 100 * (len(ordenados) - 1)))]
+
+
+class Command(BaseCommand):
+    help = 'Mide el render de cv.html con 10, 100 y 1000 cursos/proyectos/productos (p50, p99 y memoria)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanos', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--repeticiones', type=int, default=50)
+        parser.add_argument(
+            '--muestras-memoria', type=int, default=5,
+            help='Renders medidos con tracemalloc (más lentos, van aparte)',
+        )
+
+    def handle(self, *args, **options):
+        calentar_plantillas()
+        self.stdout.write(f'cv/cv.html en el cache del loader: {"sí" if plantilla_compilada("cv/cv.html") else "no"}')
+
+        # Cuenta compilaciones durante las mediciones: con el cached loader deben ser 0
+        compilar = Template.compile_nodelist
+        compilaciones = {'total': 0}
+
+        def compilar_contando(plantilla):
+            compilaciones['total'] += 1
+            return compilar(plantilla)
+
+        self.stdout.write(f'{"Items":>6} {"p50 ms":>9} {"p99 ms":>9} {"media ms":>9} {"pico KB":>9} {"HTML KB":>9}')
+        with mock.patch.object(Template, 'compile_nodelist', compilar_contando):
+            for cantidad in options['tamanos']:
+                self._medir(cantidad, options['repeticiones'], options['muestras_memoria'])
+
+        self.stdout.write(f'Compilaciones de plantillas durante la medición: {compilaciones["total"]}')
+
+    def _medir(self, cantidad, repeticiones, muestras_memoria):
+        contexto = contexto_sintetico(cantidad)
+        html = render_to_string('cv/cv.html', contexto)  # llena la memoria de URLs
+
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            render_to_string('cv/cv.html', contexto)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+
+        # Memoria que asigna un render por encima de lo que ya estaba vivo
+        picos = []
+        tracemalloc.start()
+        try:
+            for _ in range(muestras_memoria):
+                tracemalloc.reset_peak()
+                antes, _ = tracemalloc.get_traced_memory()
+                render_to_string('cv/cv.html', contexto)
+                picos.append((tracemalloc.get_traced_memory()[1] - antes) / 1024)
+        finally:
+            tracemalloc.stop()
+
+        self.stdout.write(
+            f'{cantidad:>6} {percentil(tiempos, 50):>9.2f} {percentil(tiempos, 99):>9.2f} '
+            f'{statistics.fmean(tiempos):>9.2f} {statistics.median(picos) if picos else 0:>9.0f} '
+            f'{len(html.encode()) / 1024:>9.0f}'
+        )
@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from .medir_render_cv import percentil
+
+# Lo que SQLite hace si no se le dice nada (modo de Django antes de SQLITE_PRAGMAS)
+POR_DEFECTO = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+FILAS = 5000
+
+
+def preparar_base(ruta, pragmas):
+    conexion = sqlite3.connect(ruta)
+    aplicar_pragmas(conexion, pragmas)
+    conexion.execute(
+        'CREATE TABLE certificado (id INTEGER PRIMARY KEY, titulo TEXT, institucion TEXT, '
+        'descripcion TEXT, actualizado REAL)'
+    )
+    conexion.executemany(
+        'INSERT INTO certificado (titulo, institucion, descripcion, actualizado) VALUES (?, ?, ?, ?)',
+        ((f'Curso {i}', f'Institución {i % 20}', 'Descripción del curso ' * 10, time.time()) for i in range(FILAS)),
+    )
+    conexion.commit()
+    conexion.close()
+
+
+def aplicar_pragmas(conexion, pragmas):
+    for pragma, valor in pragmas.items():
+        conexion.execute(f'PRAGMA {pragma}={valor}')
+
+
+def escritor(ruta, pragmas, hasta, filas_por_guardado, resultado):
+    """Un admin guardando sin parar: transacciones que tocan varias filas"""
+    conexion = sqlite3.connect(ruta, timeout=5, isolation_level=None)
+    aplicar_pragmas(conexion, pragmas)
+    guardados, errores = 0, 0
+    while time.perf_counter() < hasta:
+        try:
+            conexion.execute('BEGIN IMMEDIATE')
+            conexion.execute(
+                'UPDATE certificado SET actualizado = ?, descripcion = descripcion WHERE id % ? = ?',
+                (time.time(), FILAS // filas_por_guardado, guardados % (FILAS // filas_por_guardado)),
+            )
+            conexion.execute('COMMIT')
+            guardados += 1
+        except sqlite3.OperationalError:
+            errores += 1
+            if conexion.in_transaction:
+                conexion.execute('ROLLBACK')
+    conexion.close()
+    resultado.update(guardados=guardados, errores_escritura=errores)
+
+
+def lector(ruta, pragmas, hasta, tiempos, errores):
+    """Una petición pública: la lista de cursos ordenada"""
+    conexion = sqlite3.connect(ruta, timeout=5)
+    aplicar_pragmas(conexion, pragmas)
+    while time.perf_counter() < hasta:
+        inicio = time.perf_counter()
+        try:
+            conexion.execute('SELECT id, titulo, institucion FROM certificado ORDER BY actualizado DESC LIMIT 50').fetchall()
+        except sqlite3.OperationalError:
+            errores.append(1)
+            continue
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    conexion.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara lecturas concurrentes mientras un escritor guarda sin parar, '
+        'con SQLite por defecto y con settings.SQLITE_PRAGMAS (base temporal)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lectores', type=int, default=4)
+        parser.add_argument('--segundos', type=float, default=3)
+        parser.add_argument('--filas-por-guardado', type=int, default=50)
+        parser.add_argument(
+            '--umbral-ms', type=float, default=50,
+            help='Una lectura más lenta que esto cuenta como bloqueada',
+        )
+
+    def handle(self, *args, **options):
+        configuraciones = {'por defecto': POR_DEFECTO, 'ajustada': settings.SQLITE_PRAGMAS}
+        self.stdout.write(
+            f'{options["lectores"]} lectores + 1 escritor durante {options["segundos"]:.0f} s '
+            f'({FILAS} filas, {options["filas_por_guardado"]} por guardado)'
+        )
+        self.stdout.write(
+            f'{"Configuración":<13} {"lect/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"máx ms":>8} '
+            f'{"bloq.":>6} {"errores":>8} {"guard/s":>8}'
+        )
+        for nombre, pragmas in configuraciones.items():
+            with tempfile.TemporaryDirectory() as directorio:
+                fila = self._medir(os.path.join(directorio, 'bench.sqlite3'), pragmas, options)
+            self.stdout.write(f'{nombre:<13} {fila}')
+
+    def _medir(self, ruta, pragmas, options):
+        preparar_base(ruta, pragmas)
+        segundos = options['segundos']
+        hasta = time.perf_counter() + segundos
+        tiempos, errores, escritura = [], [], {}
+
+        hilos = [threading.Thread(
+            target=escritor, args=(ruta, pragmas, hasta, options['filas_por_guardado'], escritura),
+        )]
+        hilos += [
+            threading.Thread(target=lector, args=(ruta, pragmas, hasta, tiempos, errores))
+            for _ in range(options['lectores'])
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        bloqueadas = sum(1 for ms in tiempos if ms > options['umbral_ms'])
+        return (
+            f'{len(tiempos) / segundos:>8.0f} {statistics.median(tiempos) if tiempos else 0:>8.2f} '
+            f'{percentil(tiempos, 99) if tiempos else 0:>8.2f} {max(tiempos, default=0):>8.1f} '
+            f'{bloqueadas:>6} {len(errores):>8} {escritura.get("guardados", 0) / segundos:>8.0f}'
+        )
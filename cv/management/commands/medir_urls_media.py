@@ -0,0 +1,63 @@
+import time
+
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from cv.services import cargar_contexto_cv
+
+
+class Command(BaseCommand):
+    help = 'Mide cuánto del render de cv.html se va en generar URLs de media'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slug', help='Perfil a renderizar (por defecto el primero)')
+        parser.add_argument('--repeticiones', type=int, default=50)
+        parser.add_argument('--sin-memoria', action='store_true', help='Desactiva la memoria de URLs para comparar')
+
+    def handle(self, *args, **options):
+        storage = storages['default']
+        contexto = cargar_contexto_cv(options['slug'])
+        if contexto['perfil'] is None:
+            raise CommandError('No hay perfil para renderizar.')
+
+        memorizar_antes = getattr(storage, 'memorizar_urls', None)
+        if memorizar_antes is not None:
+            storage.memorizar_urls = not options['sin_memoria']
+            storage._urls.clear()
+
+        url_original = storage.url
+        medicion = {'llamadas': 0, 'segundos': 0.0}
+
+        def url_medida(name):
+            inicio = time.perf_counter()
+            try:
+                return url_original(name)
+            finally:
+                medicion['segundos'] += time.perf_counter() - inicio
+                medicion['llamadas'] += 1
+
+        storage.url = url_medida
+        try:
+            # El primer render llena la memoria y compila la plantilla; no cuenta
+            render_to_string('cv/cv.html', contexto)
+            medicion.update(llamadas=0, segundos=0.0)
+
+            inicio = time.perf_counter()
+            for _ in range(options['repeticiones']):
+                render_to_string('cv/cv.html', contexto)
+            total = time.perf_counter() - inicio
+        finally:
+            del storage.url
+            if memorizar_antes is not None:
+                storage.memorizar_urls = memorizar_antes
+
+        repeticiones = options['repeticiones']
+        por_render = total / repeticiones * 1000
+        urls_por_render = medicion['llamadas'] / repeticiones
+        ms_urls = medicion['segundos'] / repeticiones * 1000
+        porcentaje = medicion['segundos'] / total * 100 if total else 0
+
+        self.stdout.write(f'Storage: {type(storage).__name__} (memoria de URLs: {"no" if options["sin_memoria"] else "sí"})')
+        self.stdout.write(f'Render completo de cv.html: {por_render:.2f} ms')
+        self.stdout.write(f'URLs de media por render: {urls_por_render:.0f} llamadas, {ms_urls:.3f} ms ({porcentaje:.1f}%)')
@@ -0,0 +1,59 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from cv.miniaturas import tareas_disponibles, reclamar, procesar
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Genera las miniaturas pendientes de los certificados PDF (worker de la cola)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencia', type=int, default=2, help='Conversiones simultáneas (por defecto 2)')
+        parser.add_argument('--reintentos', type=int, default=3, help='Intentos antes de marcar error (por defecto 3)')
+        parser.add_argument('--intervalo', type=float, default=5.0, help='Segundos entre sondeos cuando la cola está vacía')
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la cola y termina en lugar de quedarse escuchando')
+
+    def handle(self, *args, **options):
+        concurrencia = max(1, options['concurrencia'])
+        fallidas = 0
+
+        with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+            while True:
+                close_old_connections()
+                reclamadas = [pk for pk in tareas_disponibles(concurrencia) if reclamar(pk)]
+
+                if not reclamadas:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                futuros = {
+                    pk: pool.submit(self._ejecutar, pk, options['reintentos'])
+                    for pk in reclamadas
+                }
+                for pk, futuro in futuros.items():
+                    try:
+                        estado = futuro.result()
+                    except Exception:
+                        # Un fallo fuera de procesar() (p. ej. la base) no corta el worker;
+                        # la reserva vence y la tarea vuelve a la cola
+                        fallidas += 1
+                        logger.exception('Falló la tarea de miniatura del certificado %s', pk)
+                        self.stderr.write(f'Certificado {pk}: falló ({fallidas} fallas desde que arrancó)')
+                        continue
+                    estilo = self.style.SUCCESS if estado == 'lista' else self.style.WARNING
+                    self.stdout.write(estilo(f'Certificado {pk}: {estado}'))
+
+    def _ejecutar(self, pk, reintentos):
+        # Cada hilo abre su propia conexión; se cierra para no dejarla colgada
+        try:
+            return procesar(pk, reintentos)
+        finally:
+            connection.close()
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from cv.imagenes import reclamar_variantes, procesar_variantes
+
+
+class Command(BaseCommand):
+    help = 'Genera las variantes (anchos × AVIF/WebP/JPEG) de las imágenes subidas (worker de la cola)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=5.0, help='Segundos entre sondeos cuando la cola está vacía')
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la cola y termina en lugar de quedarse escuchando')
+
+    def handle(self, *args, **options):
+        # Una tarea a la vez: Pillow ya usa varios núcleos al codificar AVIF
+        while True:
+            close_old_connections()
+            tarea = reclamar_variantes()
+
+            if tarea is None:
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            inicio = time.perf_counter()
+            cambio = procesar_variantes(tarea)
+            self.stdout.write(
+                f'{tarea}: {"variantes generadas" if cambio else "sin cambios"} '
+                f'en {(time.perf_counter() - inicio) * 1000:.0f} ms'
+            )
@@ -0,0 +1,137 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from cv.models import Certificado
+
+
+def _inicializar_proceso():
+    # Con 'spawn' (macOS/Windows) el hijo arranca sin Django configurado;
+    # con 'fork' hereda la configuración pero no debe reusar conexiones
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def _rasterizar(pk, dpi):
+    """
+    Corre en un proceso del pool. Devuelve (pk, estado, error o None).
+    Reserva la fila con la misma cola que procesar_miniaturas, así un
+    worker en marcha y el relleno nunca convierten el mismo PDF a la vez.
+    """
+    from cv.miniaturas import generar_imagen_desde_pdf, reclamar
+
+    if not reclamar(pk):
+        return pk, 'reservado', None
+    try:
+        obj = Certificado.objects.get(pk=pk)
+        generar_imagen_desde_pdf(obj, dpi=dpi)
+    except Exception as exc:
+        error = f'{type(exc).__name__}: {exc}'
+        # Se libera la reserva: vuelve a la cola y al reanudar se reintenta
+        Certificado.objects.filter(pk=pk).update(
+            estado_imagen='pendiente', proximo_intento_imagen=None, error_imagen=error,
+        )
+        return pk, 'error', error
+    Certificado.objects.filter(pk=pk).update(
+        estado_imagen='lista', proximo_intento_imagen=None, error_imagen='',
+    )
+    return pk, 'lista', None
+
+
+class Command(BaseCommand):
+    help = 'Genera en paralelo las miniaturas faltantes de todos los certificados PDF'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dpi', type=int, default=200, help='Resolución de la conversión (por defecto 200)')
+        parser.add_argument(
+            '--procesos', type=int, default=os.cpu_count() or 1,
+            help='Procesos en paralelo (por defecto, uno por núcleo)',
+        )
+        parser.add_argument(
+            '--checkpoint', default=str(settings.BASE_DIR / '.rellenar_miniaturas.json'),
+            help='Archivo donde se guarda el avance para poder reanudar',
+        )
+        parser.add_argument('--reiniciar', action='store_true', help='Ignora el checkpoint y empieza desde el principio')
+
+    def handle(self, *args, **options):
+        checkpoint = options['checkpoint']
+        desde = 0 if options['reiniciar'] else self._leer_checkpoint(checkpoint)
+
+        sin_miniatura = (
+            Certificado.objects
+            .filter(archivo__iendswith='.pdf', pk__gt=desde)
+            .filter(Q(imagen='') | Q(imagen__isnull=True))
+        )
+        pendientes = list(sin_miniatura.order_by('pk').values_list('pk', flat=True))
+        total = len(pendientes)
+        if not total:
+            self.stdout.write(self.style.SUCCESS('No hay certificados sin miniatura.'))
+            return
+
+        self.stdout.write(f'{total} certificados por procesar con {options["procesos"]} procesos (desde pk > {desde})')
+
+        # Todo entra a la cola de miniaturas para que los hijos puedan reclamarlo,
+        # salvo lo que un worker tiene reservado ahora mismo (ese lo termina él)
+        sin_miniatura.exclude(
+            estado_imagen='procesando', proximo_intento_imagen__gt=timezone.now(),
+        ).update(estado_imagen='pendiente', proximo_intento_imagen=None)
+
+        # Los hijos abren sus propias conexiones; no se heredan las del padre
+        connections.close_all()
+
+        terminados = set()
+        errores = reservados = 0
+        siguiente = 0  # índice del primer pk aún sin terminar en orden
+
+        with ProcessPoolExecutor(max_workers=options['procesos'], initializer=_inicializar_proceso) as pool:
+            futuros = [pool.submit(_rasterizar, pk, options['dpi']) for pk in pendientes]
+            for hechos, futuro in enumerate(as_completed(futuros), start=1):
+                pk, estado, error = futuro.result()
+                if estado == 'lista':
+                    terminados.add(pk)
+                    self.stdout.write(f'[{hechos}/{total}] Certificado {pk}: ok ({hechos * 100 // total}%)')
+                elif estado == 'reservado':
+                    reservados += 1
+                    self.stdout.write(self.style.WARNING(f'[{hechos}/{total}] Certificado {pk}: lo tiene otro worker'))
+                else:
+                    errores += 1
+                    self.stdout.write(self.style.WARNING(f'[{hechos}/{total}] Certificado {pk}: {error}'))
+
+                # El checkpoint avanza solo sobre el prefijo contiguo de miniaturas
+                # generadas: ni los errores ni lo reservado por otro worker lo
+                # mueven, así al reanudar se vuelven a intentar (lo que ya tenga
+                # imagen para entonces sale solo de la consulta)
+                avance = siguiente
+                while avance < total and pendientes[avance] in terminados:
+                    avance += 1
+                if avance != siguiente:
+                    siguiente = avance
+                    self._guardar_checkpoint(checkpoint, pendientes[siguiente - 1])
+
+        if siguiente == total and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        resumen = f'{len(terminados)} miniaturas generadas, {errores} con error, {reservados} en manos de otro worker'
+        self.stdout.write(self.style.SUCCESS(resumen) if len(terminados) == total else self.style.WARNING(resumen))
+
+    def _leer_checkpoint(self, ruta):
+        try:
+            with open(ruta) as archivo:
+                return json.load(archivo)['ultimo_pk']
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def _guardar_checkpoint(self, ruta, ultimo_pk):
+        temporal = f'{ruta}.tmp'
+        with open(temporal, 'w') as archivo:
+            json.dump({'ultimo_pk': ultimo_pk}, archivo)
+        os.replace(temporal, ruta)
@@ -0,0 +1,25 @@
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+
+from cv.storage import AlmacenamientoEspejo
+
+
+class Command(BaseCommand):
+    help = 'Replica en el storage remoto los archivos media que quedaron pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limite', type=int, default=None, help='Máximo de tareas a procesar')
+
+    def handle(self, *args, **options):
+        storage = storages['default']
+        if not isinstance(storage, AlmacenamientoEspejo):
+            raise CommandError('El storage por defecto no es AlmacenamientoEspejo.')
+        if storage.espejo is None:
+            raise CommandError('No hay espejo configurado (MEDIA_ESPEJO está vacío).')
+
+        storage.liberar_vencidas()
+        pendientes = len(storage.tareas())
+        hechas, fallidas = storage.sincronizar(options['limite'])
+
+        resumen = f'{hechas} replicadas, {fallidas} con error, {pendientes - hechas - fallidas} sin procesar'
+        self.stdout.write(self.style.SUCCESS(resumen) if not fallidas else self.style.WARNING(resumen))
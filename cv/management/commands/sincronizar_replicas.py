@@ -0,0 +1,71 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+
+from cv.cache import version_actual
+from cv.routers import TABLA_VERSION, version_replica
+
+
+def copiar_base(origen, ruta_destino, version=None):
+    """
+    Copia consistente de la base SQLite de `origen` (una conexión de Django)
+    con la API de backup. Se escribe sobre el archivo de la réplica en su
+    lugar: los workers que lo tienen abierto ven los datos nuevos sin reconectar.
+    Con `version`, la réplica queda marcada con ella (RouterReplicas solo la
+    usa mientras coincida con la versión actual del CV).
+    """
+    origen.ensure_connection()
+    destino = sqlite3.connect(ruta_destino, timeout=30)
+    try:
+        origen.connection.backup(destino)
+        if version is not None:
+            # Texto: las versiones no entran en un INTEGER de SQLite (64 bits)
+            with destino:
+                destino.execute(f'CREATE TABLE IF NOT EXISTS {TABLA_VERSION} (version TEXT NOT NULL)')
+                destino.execute(f'DELETE FROM {TABLA_VERSION}')
+                destino.execute(f'INSERT INTO {TABLA_VERSION} (version) VALUES (?)', (str(version),))
+    finally:
+        destino.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Copia la base principal a cada réplica de settings.REPLICAS_LECTURA '
+        '(copias SQLite locales) y marca cada copia con la versión del CV. '
+        'Con --intervalo se queda corriendo y copia cada vez que hay cambios.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo', type=float,
+            help='Segundos entre revisiones; sin esto copia una vez y termina',
+        )
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Solo sirve para réplicas SQLite locales; otras bases replican por su cuenta')
+        if not settings.REPLICAS_LECTURA:
+            self.stdout.write('No hay réplicas configuradas (DATABASE_REPLICAS)')
+            return
+
+        while True:
+            close_old_connections()
+            self._sincronizar()
+            if options['intervalo'] is None:
+                break
+            time.sleep(options['intervalo'])
+
+    def _sincronizar(self):
+        # Se lee antes de copiar: la copia tiene como mínimo los datos de esta
+        # versión, y si algo cambia durante el backup la versión ya no coincide
+        version = version_actual()
+        for alias in settings.REPLICAS_LECTURA:
+            if version_replica(alias) == str(version):
+                continue
+            connections[alias].close()
+            inicio = time.perf_counter()
+            copiar_base(connections['default'], connections[alias].settings_dict['NAME'], version)
+            self.stdout.write(f'{alias}: copiada en {(time.perf_counter() - inicio) * 1000:.0f} ms')
@@ -0,0 +1,141 @@
+import re
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+APP = Path(__file__).resolve().parents[2]
+# Fuentes completas (no van al repositorio, ver .gitignore):
+#   bootstrap-icons/  bootstrap-icons.min.css y .woff2 del paquete npm bootstrap-icons
+#   inter/            Inter-{Regular,Medium,SemiBold,Bold}.woff2 del release de Inter
+#   poppins/          Poppins-{Bold,ExtraBold,Black}.ttf de google/fonts (ofl/poppins)
+ORIGEN = APP / 'assets'
+ESTATICOS = APP / 'static' / 'cv'
+
+# Dónde se buscan las clases bi-* que usa el sitio
+FUENTES_DE_ICONOS = [APP / 'templates', ESTATICOS / 'js']
+ICONO = re.compile(r'\bbi-[a-z0-9]+(?:-[a-z0-9]+)*\b')
+REGLA_ICONO = re.compile(r'\.(bi-[a-z0-9-]+)::before\{content:"\\([0-9a-f]+)"\}')
+
+# Inter: solo los pesos del texto (los títulos de 800/900 van en Poppins)
+PESOS_INTER = {400: 'Regular', 500: 'Medium', 600: 'SemiBold', 700: 'Bold'}
+# Poppins: solo los pesos de los títulos en cv.css
+PESOS_POPPINS = {700: 'Bold', 800: 'ExtraBold', 900: 'Black'}
+# Latín básico + Latin-1 (tildes, ñ, ¿¡) + tipografía común
+UNICODE_INTER = 'U+0020-007E,U+00A0-00FF,U+2013-2014,U+2018-201D,U+2022,U+2026,U+20AC'
+
+CSS_ICONOS = '''/*!
+ * Bootstrap Icons v1.13.1 (https://icons.getbootstrap.com/), MIT
+ * Subconjunto generado por `manage.py subsetear_estaticos`: no editar a mano
+ */
+@font-face{font-display:block;font-family:bootstrap-icons;src:url("bootstrap-icons.woff2") format("woff2")}
+.bi::before,[class*=" bi-"]::before,[class^=bi-]::before{display:inline-block;font-family:bootstrap-icons!important;font-style:normal;font-weight:400!important;font-variant:normal;text-transform:none;line-height:1;vertical-align:-.125em;-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale}
+'''
+
+CSS_FUENTE = '''/* {familia} (SIL OFL 1.1, ver LICENSE). Generado por `manage.py subsetear_estaticos` */
+'''
+
+
+def iconos_usados():
+    usados = set()
+    for carpeta in FUENTES_DE_ICONOS:
+        for ruta in carpeta.rglob('*'):
+            if ruta.suffix in ('.html', '.js') and 'vendor' not in ruta.parts:
+                usados.update(ICONO.findall(ruta.read_text(encoding='utf-8')))
+    return usados
+
+
+def iconos_del_css(css):
+    return {nombre: int(codigo, 16) for nombre, codigo in REGLA_ICONO.findall(css)}
+
+
+class Command(BaseCommand):
+    help = (
+        'Recorta Bootstrap Icons a los iconos que usan las plantillas e Inter y '
+        'Poppins a los pesos y caracteres del sitio (requiere fonttools y brotli)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--origen', type=Path, default=ORIGEN,
+            help='Carpeta con las fuentes completas (por defecto cv/assets, fuera del repositorio)',
+        )
+        parser.add_argument(
+            '--verificar', action='store_true',
+            help='Solo comprueba que el subconjunto publicado cubra todos los iconos usados',
+        )
+
+    def handle(self, *args, **options):
+        usados = iconos_usados()
+        if options['verificar']:
+            publicados = iconos_del_css((ESTATICOS / 'vendor/bootstrap-icons/bootstrap-icons.css').read_text())
+            faltan = sorted(usados - publicados.keys())
+            if faltan:
+                raise CommandError(f'Iconos sin glifo: {", ".join(faltan)}. Ejecuta `manage.py subsetear_estaticos`.')
+            self.stdout.write(self.style.SUCCESS(f'{len(usados)} iconos cubiertos'))
+            return
+
+        try:
+            from fontTools import subset
+        except ImportError:
+            raise CommandError('Instala fonttools y brotli: pip install fonttools brotli')
+
+        origen = options['origen']
+        self._iconos(subset, origen, usados)
+        self._fuente(subset, origen, 'Inter', PESOS_INTER, 'inter/Inter-{}.woff2')
+        if (origen / 'poppins').is_dir():
+            self._fuente(subset, origen, 'Poppins', PESOS_POPPINS, 'poppins/Poppins-{}.ttf')
+        else:
+            # Sin recortes propios, cv_estaticos.fuente_titulos la pide a Google Fonts
+            self.stdout.write(self.style.WARNING(f'Poppins: falta {origen / "poppins"}, no se recorta'))
+
+    def _recortar(self, subset, origen, destino, **opciones):
+        fuente = subset.load_font(str(origen), subset.Options())
+        opts = subset.Options(flavor='woff2', **opciones.pop('opciones', {}))
+        recorte = subset.Subsetter(opts)
+        recorte.populate(**opciones)
+        recorte.subset(fuente)
+        subset.save_font(fuente, str(destino), opts)
+        self.stdout.write(f'{destino.relative_to(APP)}: {origen.stat().st_size // 1024} KB → {destino.stat().st_size // 1024} KB')
+
+    def _iconos(self, subset, origen, usados):
+        codigos = iconos_del_css((origen / 'bootstrap-icons/bootstrap-icons.min.css').read_text())
+        desconocidos = sorted(usados - codigos.keys())
+        if desconocidos:
+            self.stdout.write(self.style.WARNING(f'Ignorados (no son iconos): {", ".join(desconocidos)}'))
+        usados = sorted(usados & codigos.keys())
+
+        destino = ESTATICOS / 'vendor/bootstrap-icons'
+        self._recortar(
+            subset, origen / 'bootstrap-icons/bootstrap-icons.woff2', destino / 'bootstrap-icons.woff2',
+            unicodes=[codigos[nombre] for nombre in usados],
+            opciones={'layout_features': [], 'notdef_outline': False, 'name_IDs': ['*']},
+        )
+        reglas = ''.join(f'.{nombre}::before{{content:"\\{codigos[nombre]:x}"}}\n' for nombre in usados)
+        (destino / 'bootstrap-icons.css').write_text(CSS_ICONOS + reglas)
+        self.stdout.write(self.style.SUCCESS(f'{len(usados)} iconos de {len(codigos)}'))
+
+    def _fuente(self, subset, origen, familia, pesos, patron):
+        """Un woff2 por peso en static/cv/fonts/<familia>/ y su CSS con @font-face"""
+        carpeta = familia.lower()
+        destino = ESTATICOS / 'fonts' / carpeta
+        destino.mkdir(parents=True, exist_ok=True)
+        unicodes = subset.parse_unicodes(UNICODE_INTER)
+        css = CSS_FUENTE.format(familia=familia)
+        for peso, nombre in pesos.items():
+            archivo = f'{carpeta}-{peso}.woff2'
+            self._recortar(
+                subset, origen / patron.format(nombre), destino / archivo,
+                unicodes=unicodes, opciones={'layout_features': ['kern', 'liga', 'calt']},
+            )
+            css += (
+                f'@font-face{{font-family:"{familia}";font-style:normal;font-weight:{peso};'
+                f'font-display:swap;src:url("{archivo}") format("woff2");'
+                f'unicode-range:{UNICODE_INTER}}}\n'
+            )
+        licencia = origen / carpeta / 'LICENSE'
+        if not licencia.exists():
+            licencia = origen / carpeta / 'OFL.txt'
+        if licencia.exists():
+            (destino / 'LICENSE').write_bytes(licencia.read_bytes())
+        (destino / f'{carpeta}.css').write_text(css)
+        self.stdout.write(self.style.SUCCESS(f'{familia}: {len(pesos)} pesos'))
@@ -0,0 +1,154 @@
+import gzip
+import logging
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - Brotli es opcional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# COMPRESIÓN DE RESPUESTAS DINÁMICAS (BROTLI / GZIP)
+# ============================================
+
+# Debajo de esto la cabecera y el CPU cuestan más de lo que se ahorra
+TAMANO_MINIMO = 1024
+TIPOS_COMPRIMIBLES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+# Calidades rápidas: el HTML del CV comprime ~12x con cualquiera de las dos
+CALIDAD_BROTLI = 5
+NIVEL_GZIP = 6
+
+
+def _codificacion_aceptada(accept_encoding):
+    """'br' o 'gzip' según Accept-Encoding (respetando q=0), o None"""
+    aceptadas = {}
+    for parte in accept_encoding.split(','):
+        nombre, _, parametros = parte.strip().partition(';')
+        calidad = re.search(r'q=([0-9.]+)', parametros)
+        aceptadas[nombre.strip().lower()] = float(calidad.group(1)) if calidad else 1.0
+
+    if brotli is not None and aceptadas.get('br', 0) > 0:
+        return 'br'
+    if aceptadas.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def comprimir(contenido, codificacion):
+    if codificacion == 'br':
+        return brotli.compress(contenido, quality=CALIDAD_BROTLI)
+    # mtime=0: mismo contenido, mismos bytes (y se pueden cachear)
+    return gzip.compress(contenido, compresslevel=NIVEL_GZIP, mtime=0)
+
+
+class CompresionMiddleware:
+    """
+    Comprime con Brotli o gzip las respuestas generadas por las vistas.
+
+    - Se salta respuestas en streaming, pequeñas, ya codificadas o de tipos
+      binarios, y las que usan el token CSRF (BREACH).
+    - Si la vista marca la respuesta con `clave_compresion` (cv_view con la
+      versión de la página cacheada), los bytes comprimidos se guardan en el
+      cache y los siguientes hits no vuelven a comprimir.
+    - Cada respuesta comprimida lleva Server-Timing con el tiempo de CPU y
+      la razón de compresión, y se registra en el logger cv.middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        codificacion, clave = self._negociar(request, response)
+        if codificacion is None:
+            return response
+
+        guardado = cache.get(clave) if clave else None
+        comprimido, cpu_ms = self._comprimir(response, codificacion, guardado)
+        if guardado is None and clave:
+            cache.set(clave, comprimido, settings.CV_CACHE_TIMEOUT)
+        return self._aplicar(request, response, codificacion, comprimido, guardado is not None, cpu_ms)
+
+    async def __acall__(self, request):
+        # Bajo ASGI no obliga a Django a pasar las vistas async por un hilo
+        response = await self.get_response(request)
+        codificacion, clave = self._negociar(request, response)
+        if codificacion is None:
+            return response
+
+        # El cache en disco bloquea: aget/aset lo leen y escriben desde un
+        # hilo y el event loop sigue atendiendo mientras tanto
+        guardado = await cache.aget(clave) if clave else None
+        comprimido, cpu_ms = self._comprimir(response, codificacion, guardado)
+        if guardado is None and clave:
+            await cache.aset(clave, comprimido, settings.CV_CACHE_TIMEOUT)
+        return self._aplicar(request, response, codificacion, comprimido, guardado is not None, cpu_ms)
+
+    def _negociar(self, request, response):
+        """(codificación, clave en el cache) o (None, None) si no se comprime"""
+        if not self._comprimible(request, response):
+            return None, None
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codificacion = _codificacion_aceptada(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if codificacion is None:
+            return None, None
+        clave = getattr(response, 'clave_compresion', None)
+        return codificacion, f'{clave}:{codificacion}' if clave else None
+
+    def _comprimir(self, response, codificacion, guardado):
+        """Bytes comprimidos y CPU gastado (reusa `guardado` si vino del cache)"""
+        if guardado is not None:
+            return guardado, 0.0
+        inicio = time.thread_time()
+        comprimido = comprimir(response.content, codificacion)
+        return comprimido, (time.thread_time() - inicio) * 1000
+
+    def _aplicar(self, request, response, codificacion, comprimido, desde_cache, cpu_ms):
+        original = response.content
+        if len(comprimido) >= len(original):
+            return response
+
+        response.content = comprimido
+        response['Content-Length'] = str(len(comprimido))
+        response['Content-Encoding'] = codificacion
+        if response.has_header('ETag'):
+            # La representación cambió: el ETag pasa a ser débil, como en GZipMiddleware
+            response['ETag'] = re.sub(r'^"', 'W/"', response['ETag'])
+
+        origen = 'cache' if desde_cache else 'nuevo'
+        razon = len(original) / len(comprimido)
+        response['Server-Timing'] = (
+            f'compresion;dur={cpu_ms:.2f};desc="{codificacion} {origen} {razon:.1f}x"'
+        )
+        logger.debug(
+            'Compresión %s (%s) %s: %d → %d bytes (%.1fx) en %.2f ms de CPU',
+            codificacion, origen, request.path, len(original), len(comprimido), razon, cpu_ms,
+        )
+        return response
+
+    def _comprimible(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return False
+        if request.META.get('CSRF_COOKIE_USED'):
+            return False
+        if not response.get('Content-Type', '').startswith(TIPOS_COMPRIMIBLES):
+            return False
+        return len(response.content) >= TAMANO_MINIMO
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv', '0018_educacion_perfil_experiencia_perfil'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificado',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='educacion',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='experiencia',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='garage',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='habilidad',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='perfil',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.AddField(
+            model_name='reconocimiento',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:40
+
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def generar_slugs(apps, schema_editor):
+    Perfil = apps.get_model('cv', 'Perfil')
+    # Los de cv.models.SLUGS_RESERVADOS (copiados: la migración no debe
+    # cambiar si el modelo cambia)
+    usados = {'pdf'}
+    for perfil in Perfil.objects.order_by('pk'):
+        base = slugify(perfil.nombre)[:110] or 'perfil'
+        slug = base
+        n = 2
+        while slug in usados:
+            slug = f'{base}-{n}'
+            n += 1
+        usados.add(slug)
+        perfil.slug = slug
+        perfil.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv', '0019_certificado_actualizado_educacion_actualizado_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='perfil',
+            name='slug',
+            field=models.SlugField(blank=True, max_length=120, null=True),
+        ),
+        migrations.RunPython(generar_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='perfil',
+            name='slug',
+            field=models.SlugField(blank=True, help_text='Dirección pública del CV (/cv/<slug>/). Se genera desde el nombre si se deja vacío.', max_length=120, unique=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-17 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv', '0020_perfil_slug'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certificado',
+            index=models.Index(fields=['perfil', '-fecha'], name='certificado_perfil_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='educacion',
+            index=models.Index(fields=['perfil', '-fecha_inicio'], name='educacion_perfil_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experiencia',
+            index=models.Index(fields=['perfil', '-fecha_inicio'], name='experiencia_perfil_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='habilidad',
+            index=models.Index(fields=['perfil', 'orden', 'categoria', 'nombre'], name='habilidad_perfil_orden_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reconocimiento',
+            index=models.Index(fields=['perfil', '-fecha'], name='reconocim_perfil_fecha_idx'),
+        ),
+    ]
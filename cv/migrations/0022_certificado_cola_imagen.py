@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv', '0021_indices_por_perfil'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificado',
+            name='error_imagen',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='certificado',
+            name='estado_imagen',
+            field=models.CharField(choices=[('ninguno', 'Sin tarea'), ('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('lista', 'Lista'), ('error', 'Error')], default='ninguno', max_length=20, verbose_name='Estado de la imagen'),
+        ),
+        migrations.AddField(
+            model_name='certificado',
+            name='intentos_imagen',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='certificado',
+            name='proximo_intento_imagen',
+            field=models.DateTimeField(blank=True, help_text='Reintento programado o fin de la reserva del worker', null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-17 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv', '0023_variantes_de_imagen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaVariantes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=20)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('pedida', models.DateTimeField(auto_now=True)),
+                ('reservada_hasta', models.DateTimeField(blank=True, help_text='Fin de la reserva del worker; si muere, otro la retoma al vencer', null=True)),
+            ],
+            options={
+                'verbose_name': 'Tarea de variantes',
+                'verbose_name_plural': 'Tareas de variantes',
+                'constraints': [models.UniqueConstraint(fields=('modelo', 'objeto_id'), name='tarea_variantes_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,146 @@
+import io
+import os
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Certificado
+
+
+# ============================================
+# COLA DE MINIATURAS (SIN BROKER, EN LA BASE)
+# ============================================
+
+# Tiempo que un worker reserva una tarea; si muere, otra la retoma al vencer
+RESERVA = timedelta(minutes=10)
+# Espera antes del reintento n: 30s, 60s, 120s...
+ESPERA_BASE = timedelta(seconds=30)
+
+
+def necesita_miniatura(obj):
+    return bool(obj.archivo) and obj.archivo.name.lower().endswith('.pdf') and not obj.imagen
+
+
+def encolar_miniatura(obj):
+    """Marca el certificado como pendiente; no hace trabajo pesado"""
+    Certificado.objects.filter(pk=obj.pk).update(
+        estado_imagen='pendiente',
+        intentos_imagen=0,
+        proximo_intento_imagen=None,
+        error_imagen='',
+    )
+    obj.estado_imagen = 'pendiente'
+
+
+def _disponibles(ahora):
+    """Pendientes cuya espera ya pasó, o reservas de un worker que no terminó"""
+    pendientes = Q(estado_imagen='pendiente') & (
+        Q(proximo_intento_imagen__isnull=True) | Q(proximo_intento_imagen__lte=ahora)
+    )
+    vencidas = Q(estado_imagen='procesando', proximo_intento_imagen__lte=ahora)
+    return pendientes | vencidas
+
+
+def tareas_disponibles(limite):
+    return list(
+        Certificado.objects
+        .filter(_disponibles(timezone.now()))
+        .order_by('pk')
+        .values_list('pk', flat=True)[:limite]
+    )
+
+
+def reclamar(pk):
+    """
+    Reserva la tarea con un UPDATE condicional: si otro worker la tomó
+    primero, no se modifica ninguna fila y se devuelve False.
+    """
+    ahora = timezone.now()
+    return Certificado.objects.filter(_disponibles(ahora), pk=pk).update(
+        estado_imagen='procesando',
+        proximo_intento_imagen=ahora + RESERVA,
+    ) == 1
+
+
+def procesar(pk, max_intentos):
+    """
+    Ejecuta una tarea ya reservada y devuelve su estado final ('borrado' si
+    el certificado se eliminó después de encolarlo).
+    """
+    obj = Certificado.objects.filter(pk=pk).first()
+    if obj is None:
+        return 'borrado'
+    try:
+        if necesita_miniatura(obj):
+            generar_imagen_desde_pdf(obj)
+    except Exception as exc:
+        intentos = obj.intentos_imagen + 1
+        agotado = intentos >= max_intentos
+        actualizadas = Certificado.objects.filter(pk=pk).update(
+            estado_imagen='error' if agotado else 'pendiente',
+            intentos_imagen=intentos,
+            proximo_intento_imagen=None if agotado else timezone.now() + ESPERA_BASE * 2 ** (intentos - 1),
+            error_imagen=f'{type(exc).__name__}: {exc}',
+        )
+        if not actualizadas:
+            # Se borró mientras se convertía (el save() de la imagen falla)
+            return 'borrado'
+        return 'error' if agotado else 'pendiente'
+
+    Certificado.objects.filter(pk=pk).update(
+        estado_imagen='lista',
+        proximo_intento_imagen=None,
+        error_imagen='',
+    )
+    return 'lista'
+
+
+# ============================================
+# PDF → JPEG
+# ============================================
+
+def _primera_pagina(obj, dpi):
+    """
+    Rasteriza la página 1 leyendo el PDF una sola vez y sin pasar por HTTP:
+    - si el archivo recién subido sigue adjunto y Django ya lo tiene en disco
+      (TemporaryUploadedFile) se convierte directamente desde esa ruta;
+    - si no, se lee una vez desde el storage (upload en memoria o archivo ya
+      guardado) y se convierte desde los bytes.
+    """
+    # pdf2image solo se carga en el worker de miniaturas, no en cada proceso web
+    from pdf2image import convert_from_bytes, convert_from_path
+
+    archivo = getattr(obj.archivo, '_file', None)
+    if archivo is not None and hasattr(archivo, 'temporary_file_path'):
+        return convert_from_path(archivo.temporary_file_path(), dpi=dpi, first_page=1, last_page=1)[0]
+
+    if archivo is not None and not getattr(archivo, 'closed', True):
+        archivo.seek(0)
+        datos = archivo.read()
+    else:
+        with obj.archivo.open('rb') as pdf:
+            datos = pdf.read()
+    return convert_from_bytes(datos, dpi=dpi, first_page=1, last_page=1)[0]
+
+
+def generar_imagen_desde_pdf(obj, dpi=200):
+    # 1️⃣ Convertir PDF → imagen (sin volver a descargarlo)
+    pagina = _primera_pagina(obj, dpi)
+
+    buffer = io.BytesIO()
+    pagina.save(buffer, format="JPEG", quality=90)
+
+    nombre = os.path.splitext(
+        os.path.basename(obj.archivo.name)
+    )[0]
+
+    # 2️⃣ Guardar imagen en el storage
+    obj.imagen.save(
+        f"{nombre}.jpg",
+        ContentFile(buffer.getvalue()),
+        save=False
+    )
+
+    obj.save(update_fields=["imagen"])
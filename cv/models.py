@@ -1,12 +1,8 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.core.exceptions import ValidationError
+from django.utils.text import slugify
 from datetime import date
-from django.core.files.base import ContentFile
-from pdf2image import convert_from_path
-import requests
-import io
-import os
 
 
 # ============================================
@@ -37,8 +33,18 @@ def validate_certificate_year(value):
 # ============================================
 # MODELO: Perfil
 # ============================================
+
+# Segmentos de /cv/<...>/ que ya usan otras vistas
+SLUGS_RESERVADOS = {'pdf'}
+
 class Perfil(models.Model):
     nombre = models.CharField(max_length=100)
+    slug = models.SlugField(
+        max_length=120,
+        unique=True,
+        blank=True,
+        help_text="Dirección pública del CV (/cv/<slug>/). Se genera desde el nombre si se deja vacío."
+    )
     profesion = models.CharField(max_length=100)
     descripcion = models.TextField()
     
@@ -74,6 +80,8 @@ class Perfil(models.Model):
     github = models.URLField(blank=True)
     
     foto = models.ImageField(upload_to='perfil/', blank=True, null=True, help_text='Foto de perfil')
+    foto_variantes = models.JSONField(default=dict, blank=True, editable=False)
+    actualizado = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     class Meta:
         verbose_name_plural = "Perfiles"
@@ -81,6 +89,26 @@ class Perfil(models.Model):
     def __str__(self):
         return self.nombre
 
+    def clean(self):
+        super().clean()
+        if self.slug in SLUGS_RESERVADOS:
+            raise ValidationError({'slug': f'"{self.slug}" está reservado, elige otro.'})
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = self.generar_slug()
+        super().save(*args, **kwargs)
+
+    def generar_slug(self):
+        """Slug único a partir del nombre: jean-pierre, jean-pierre-2, ..."""
+        base = slugify(self.nombre)[:110] or 'perfil'
+        slug = base
+        n = 2
+        while slug in SLUGS_RESERVADOS or Perfil.objects.filter(slug=slug).exclude(pk=self.pk).exists():
+            slug = f'{base}-{n}'
+            n += 1
+        return slug
+
 # ============================================
 # MODELO: Educación
 # ============================================
@@ -91,10 +119,14 @@ class Educacion(models.Model):
     fecha_inicio = models.DateField(validators=[validate_certificate_year])
     fecha_fin = models.DateField(blank=True, null=True, validators=[validate_certificate_year])
     descripcion = models.TextField(blank=True)
+    actualizado = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     class Meta:
         ordering = ['-fecha_inicio'] # Orden Cronológico
         verbose_name_plural = "Educación"
+        indexes = [
+            models.Index(fields=['perfil', '-fecha_inicio'], name='educacion_perfil_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.institucion}"
@@ -109,10 +141,14 @@ class Experiencia(models.Model):
     fecha_inicio = models.DateField(validators=[validate_certificate_year])
     fecha_fin = models.DateField(blank=True, null=True, validators=[validate_certificate_year])
     descripcion = models.TextField()
+    actualizado = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     class Meta:
         ordering = ['-fecha_inicio'] # Orden Cronológico
         verbose_name_plural = "Experiencias"
+        indexes = [
+            models.Index(fields=['perfil', '-fecha_inicio'], name='experiencia_perfil_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.cargo} en {self.empresa}"
@@ -125,6 +161,14 @@ class Experiencia(models.Model):
 # MODELO: Certificado (CURSOS)
 # ============================================
 class Certificado(models.Model):
+    ESTADO_IMAGEN_CHOICES = [
+        ('ninguno', 'Sin tarea'),
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('lista', 'Lista'),
+        ('error', 'Error'),
+    ]
+
     perfil = models.ForeignKey(Perfil, on_delete=models.CASCADE, related_name="certificados")
     titulo = models.CharField(max_length=200)
     institucion = models.CharField(max_length=200)
@@ -143,10 +187,27 @@ class Certificado(models.Model):
     null=True,
     help_text="Imagen generada automáticamente desde el PDF"
     )
+    imagen_variantes = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Cola de miniaturas: la procesa `manage.py procesar_miniaturas`
+    estado_imagen = models.CharField(
+        max_length=20, choices=ESTADO_IMAGEN_CHOICES, default='ninguno',
+        verbose_name="Estado de la imagen"
+    )
+    intentos_imagen = models.PositiveSmallIntegerField(default=0)
+    proximo_intento_imagen = models.DateTimeField(
+        blank=True, null=True,
+        help_text="Reintento programado o fin de la reserva del worker"
+    )
+    error_imagen = models.TextField(blank=True)
+    actualizado = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     class Meta:
         ordering = ['-fecha'] # Orden Cronológico
         verbose_name_plural = "Certificados"
+        indexes = [
+            models.Index(fields=['perfil', '-fecha'], name='certificado_perfil_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.institucion}"
@@ -167,10 +228,14 @@ class Reconocimiento(models.Model):
     )
     descripcion = models.TextField(blank=True, null=True)
     archivo = models.FileField(upload_to="reconocimientos/", blank=True, null=True)
+    actualizado = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     class Meta:
         ordering = ['-fecha'] # Orden Cronológico
         verbose_name_plural = "Reconocimientos"
+        indexes = [
+            models.Index(fields=['perfil', '-fecha'], name='reconocim_perfil_fecha_idx'),
+        ]
 
     def __str__(self):
         return self.titulo
@@ -185,6 +250,7 @@ class Proyecto(models.Model):
     tecnologias = models.CharField(max_length=300)
     github = models.URLField(blank=True, null=True)
     demo = models.URLField(blank=True, null=True)
+    actualizado = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     class Meta:
         verbose_name_plural = "Proyectos"
@@ -219,7 +285,9 @@ class Garage(models.Model):
     descripcion = models.TextField()
     valordelbien = models.DecimalField(max_digits=7, decimal_places=2, validators=[MinValueValidator(0.01)])
     imagen = models.ImageField(upload_to="garage/", blank=True, null=True)
+    imagen_variantes = models.JSONField(default=dict, blank=True, editable=False)
     activarparaqueseveaenfront = models.BooleanField(default=True)
+    actualizado = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
 
     class Meta:
         verbose_name = "Producto de Garage"
@@ -237,11 +305,43 @@ class Habilidad(models.Model):
         help_text="Porcentaje de dominio (0-100)"
     )
     orden = models.IntegerField(default=0, help_text="Orden de aparición")
+    actualizado = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
     
     class Meta:
         ordering = ['orden', 'categoria', 'nombre']
         verbose_name = 'Habilidad'
         verbose_name_plural = 'Habilidades'
+        indexes = [
+            models.Index(fields=['perfil', 'orden', 'categoria', 'nombre'], name='habilidad_perfil_orden_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.nombre} ({self.categoria}) - {self.nivel}%"
\ No newline at end of file
+        return f"{self.nombre} ({self.categoria}) - {self.nivel}%"
+
+# ============================================
+# COLA: variantes de imagen pendientes
+# ============================================
+class TareaVariantes(models.Model):
+    """
+    Imagen (Perfil, Certificado o Garage) a la que le faltan sus variantes.
+    La procesa `manage.py procesar_variantes` fuera del guardado del admin.
+    """
+    modelo = models.CharField(max_length=20)
+    objeto_id = models.PositiveBigIntegerField()
+    # Cada nuevo pedido la actualiza: el worker no borra una tarea que se volvió
+    # a pedir mientras generaba (otra imagen subida encima)
+    pedida = models.DateTimeField(auto_now=True)
+    reservada_hasta = models.DateTimeField(
+        blank=True, null=True,
+        help_text="Fin de la reserva del worker; si muere, otro la retoma al vencer"
+    )
+
+    class Meta:
+        verbose_name = "Tarea de variantes"
+        verbose_name_plural = "Tareas de variantes"
+        constraints = [
+            models.UniqueConstraint(fields=['modelo', 'objeto_id'], name='tarea_variantes_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} {self.objeto_id}"
@@ -0,0 +1,74 @@
+import mimetypes
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+
+
+# ============================================
+# PDF DEL CV (WEASYPRINT)
+# ============================================
+
+# Mismos valores que las casillas del modal "Generar PDF" de cv.html
+SECCIONES_PDF = (
+    'dashboard', 'perfil', 'skills', 'formacion', 'experiencia',
+    'cursos', 'reconocimientos', 'proyectos', 'garage',
+)
+# Marcadas por defecto en el modal (todas menos Garage)
+SECCIONES_POR_DEFECTO = tuple(s for s in SECCIONES_PDF if s != 'garage')
+
+
+def secciones_desde_query(request):
+    """?secciones=perfil&secciones=skills → tupla ordenada y validada"""
+    pedidas = set(request.GET.getlist('secciones'))
+    if not pedidas:
+        return SECCIONES_POR_DEFECTO
+    return tuple(s for s in SECCIONES_PDF if s in pedidas)
+
+
+def _abrir_estatico(nombre):
+    # Con collectstatic el nombre trae hash y está en STATIC_ROOT; sin él, en las apps
+    if staticfiles_storage.exists(nombre):
+        return staticfiles_storage.open(nombre)
+    ruta = finders.find(nombre)
+    if ruta is None:
+        raise FileNotFoundError(f'Estático no encontrado: {nombre}')
+    return open(ruta, 'rb')
+
+
+def url_fetcher_local(base_url):
+    """
+    url_fetcher para WeasyPrint: las imágenes y hojas de estilo de este mismo
+    sitio (MEDIA_URL, STATIC_URL) se leen del storage o de los finders en vez
+    de pedirse por HTTP al propio servidor, que con todos los workers ocupados
+    renderizando PDFs se quedaría esperándose a sí mismo. El resto de URLs
+    (espejo remoto, data:) van al fetcher de WeasyPrint.
+    """
+    sitio = urlsplit(base_url).netloc
+
+    def fetcher(url):
+        partes = urlsplit(url)
+        ruta = unquote(partes.path)
+        local = partes.scheme in ('http', 'https') and partes.netloc == sitio
+        if local and ruta.startswith(settings.MEDIA_URL):
+            archivo = default_storage.open(ruta[len(settings.MEDIA_URL):])
+        elif local and ruta.startswith(settings.STATIC_URL):
+            archivo = _abrir_estatico(ruta[len(settings.STATIC_URL):])
+        else:
+            from weasyprint import default_url_fetcher
+            return default_url_fetcher(url)
+
+        with archivo:
+            return {'string': archivo.read(), 'mime_type': mimetypes.guess_type(ruta)[0], 'redirected_url': url}
+    return fetcher
+
+
+def renderizar_pdf(contexto, secciones, base_url):
+    # WeasyPrint es pesado de importar; solo se carga al generar un PDF
+    from weasyprint import HTML
+
+    html = render_to_string('cv/cv_pdf.html', {**contexto, 'secciones': secciones})
+    return HTML(string=html, base_url=base_url, url_fetcher=url_fetcher_local(base_url)).write_pdf()
@@ -0,0 +1,105 @@
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .cache import version_actual
+
+
+# ============================================
+# RÉPLICAS DE LECTURA PARA LAS PÁGINAS PÚBLICAS
+# ============================================
+
+# None fuera de las vistas marcadas; dentro, un dict con la réplica elegida
+# para todo el request (una sola foto de los datos) y si hubo una escritura
+# (desde ahí el request sigue en la principal)
+_lectura_publica = ContextVar('cv_lectura_publica', default=None)
+
+
+# Tabla que sincronizar_replicas escribe dentro de cada copia: la versión del
+# CV (cv.cache.version_actual) que tenía la principal al empezar esa copia
+TABLA_VERSION = 'cv_replica_version'
+
+
+def version_replica(alias):
+    """Versión con la que se copió la réplica, o None si no tiene o no se pudo leer"""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f'SELECT version FROM {TABLA_VERSION}')
+            fila = cursor.fetchone()
+    except DatabaseError:
+        return None
+    return fila[0] if fila else None
+
+
+def replica_al_dia():
+    """Una réplica (al azar) que ya tenga la versión actual del CV, o None"""
+    version = str(version_actual())
+    for alias in random.sample(settings.REPLICAS_LECTURA, len(settings.REPLICAS_LECTURA)):
+        if version_replica(alias) == version:
+            return alias
+    return None
+
+
+def lectura_en_replica(vista):
+    """
+    Las consultas de lectura de la vista van a una réplica (RouterReplicas),
+    salvo que no haya réplicas o que ninguna tenga todavía el último cambio
+    del admin. Sirve para vistas sync y async.
+    """
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        async def envoltura(request, *args, **kwargs):
+            replica = await sync_to_async(replica_al_dia)() if settings.REPLICAS_LECTURA else None
+            if replica is None:
+                return await vista(request, *args, **kwargs)
+            token = _lectura_publica.set({'replica': replica, 'escribio': False})
+            try:
+                return await vista(request, *args, **kwargs)
+            finally:
+                _lectura_publica.reset(token)
+        return envoltura
+
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        replica = replica_al_dia() if settings.REPLICAS_LECTURA else None
+        if replica is None:
+            return vista(request, *args, **kwargs)
+        token = _lectura_publica.set({'replica': replica, 'escribio': False})
+        try:
+            return vista(request, *args, **kwargs)
+        finally:
+            _lectura_publica.reset(token)
+    return envoltura
+
+
+class RouterReplicas:
+    """
+    - Lecturas dentro de lectura_en_replica → la réplica al día elegida
+      para ese request.
+    - Todo lo demás (admin, comandos, escrituras y lo que se lee después de
+      escribir) → 'default'.
+    - Las réplicas no se migran: son copias de la principal.
+    """
+
+    def db_for_read(self, model, **hints):
+        estado = _lectura_publica.get()
+        if estado is None or estado['escribio']:
+            return None
+        return estado['replica']
+
+    def db_for_write(self, model, **hints):
+        estado = _lectura_publica.get()
+        if estado is not None:
+            estado['escribio'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Mismos datos en todas las bases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in settings.REPLICAS_LECTURA else None
@@ -0,0 +1,117 @@
+from django.db.models import Max, Prefetch
+
+from .models import (
+    Perfil, Educacion, Experiencia, Habilidad,
+    Certificado, Reconocimiento, Proyecto, Garage
+)
+
+
+# ============================================
+# CARGA DEL PERFIL (UNA CONSULTA POR SECCIÓN)
+# ============================================
+
+# related_name → consulta de cada sección (orden incluido)
+CONSULTAS_SECCIONES = {
+    'educacion': lambda: Educacion.objects.order_by('-fecha_inicio'),
+    'experiencia': lambda: Experiencia.objects.order_by('-fecha_inicio'),
+    'habilidades': lambda: Habilidad.objects.all(),
+    'certificados': lambda: Certificado.objects.order_by('-fecha'),
+    'reconocimientos': lambda: Reconocimiento.objects.all(),
+    'proyectos': lambda: Proyecto.objects.all(),
+    'garage': lambda: Garage.objects.all(),
+}
+
+
+def perfiles_con_secciones():
+    """Queryset de Perfil con todas las secciones del CV precargadas"""
+    return Perfil.objects.prefetch_related(*(
+        Prefetch(nombre, queryset=consulta()) for nombre, consulta in CONSULTAS_SECCIONES.items()
+    ))
+
+
+def _contexto(perfil, secciones):
+    return {
+        'perfil': perfil,
+        **secciones,
+        'total_certificados': len(secciones['certificados']),
+        'total_reconocimientos': len(secciones['reconocimientos']),
+        'total_proyectos': len(secciones['proyectos']),
+    }
+
+
+def cargar_contexto_cv(slug=None):
+    """
+    Devuelve el contexto de cv.html con listas ya materializadas.
+    El número de consultas es fijo (1 + una por sección) sin importar
+    cuántos registros tenga cada sección.
+
+    Sin slug se usa el primer perfil (ruta histórica /cv/).
+    """
+    perfiles = perfiles_con_secciones()
+    if slug is None:
+        perfil = perfiles.first()
+    else:
+        perfil = perfiles.filter(slug=slug).first()
+
+    if perfil is None:
+        return _contexto(None, {nombre: [] for nombre in CONSULTAS_SECCIONES})
+    return _contexto(perfil, {
+        nombre: list(getattr(perfil, nombre).all()) for nombre in CONSULTAS_SECCIONES
+    })
+
+
+async def cargar_contexto_cv_async(slug=None):
+    """
+    Igual que cargar_contexto_cv() pero con el ORM async: mismas consultas
+    (1 + una por sección) y mismo contexto. Las secciones se piden una tras
+    otra: el ORM async corre cada consulta en el hilo compartido de
+    sync_to_async, así que no se solapan, pero el event loop queda libre
+    para otros requests mientras esperan.
+    """
+    perfiles = Perfil.objects.all()
+    if slug is None:
+        perfil = await perfiles.afirst()
+    else:
+        perfil = await perfiles.filter(slug=slug).afirst()
+
+    if perfil is None:
+        return _contexto(None, {nombre: [] for nombre in CONSULTAS_SECCIONES})
+
+    return _contexto(perfil, {
+        nombre: [obj async for obj in consulta().filter(perfil=perfil)]
+        for nombre, consulta in CONSULTAS_SECCIONES.items()
+    })
+
+
+def ultima_modificacion_bd():
+    """Fecha más reciente de 'actualizado' entre todos los modelos del CV"""
+    fechas = [
+        modelo.objects.aggregate(ultima=Max('actualizado'))['ultima']
+        for modelo in (
+            Perfil, Educacion, Experiencia, Habilidad,
+            Certificado, Reconocimiento, Proyecto, Garage,
+        )
+    ]
+    fechas = [fecha for fecha in fechas if fecha is not None]
+    return max(fechas) if fechas else None
+
+
+def listar_perfiles(despues=None, limite=50):
+    """
+    Página de perfiles ordenada por slug con paginación por llave (keyset):
+    WHERE slug > :despues ORDER BY slug LIMIT :limite usa el índice único
+    y cuesta lo mismo en la página 1 que en la 1000.
+    Devuelve (perfiles, siguiente) donde siguiente es el slug para pedir
+    la página que sigue o None si no hay más.
+    """
+    perfiles = Perfil.objects.order_by('slug').only('nombre', 'profesion', 'slug')
+    if despues:
+        perfiles = perfiles.filter(slug__gt=despues)
+
+    pagina = list(perfiles[:limite + 1])
+    siguiente = pagina[limite - 1].slug if len(pagina) > limite else None
+    return pagina[:limite], siguiente
+
+
+def existe_perfil(slug):
+    return Perfil.objects.filter(slug=slug).exists()
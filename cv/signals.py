@@ -0,0 +1,94 @@
+from functools import partial
+
+from django.db import models, transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+
+from .cache import incrementar_version
+from .imagenes import encolar_variantes, variantes_desactualizadas
+from .storage import archivos_replicados
+from .models import (
+    Perfil, Educacion, Experiencia, Habilidad,
+    Certificado, Reconocimiento, Proyecto, Garage
+)
+
+# Modelos que se muestran en /cv/
+MODELOS_CV = (
+    Perfil, Educacion, Experiencia, Habilidad,
+    Certificado, Reconocimiento, Proyecto, Garage,
+)
+
+
+def invalidar_cache_cv(sender, **kwargs):
+    # Tras el commit: antes, un request concurrente podía renderizar las filas
+    # viejas y cachearlas con la versión nueva hasta el próximo cambio
+    transaction.on_commit(partial(incrementar_version, sender._meta.model_name))
+
+
+for modelo in MODELOS_CV:
+    post_save.connect(invalidar_cache_cv, sender=modelo, dispatch_uid=f'cv_cache_save_{modelo.__name__}')
+    post_delete.connect(invalidar_cache_cv, sender=modelo, dispatch_uid=f'cv_cache_delete_{modelo.__name__}')
+
+
+def pedir_variantes(sender, instance, raw=False, **kwargs):
+    # Con fixtures (raw) no se toca el storage. La tarea entra en la misma
+    # transacción; las genera `procesar_variantes`, que invalida al terminar
+    if not raw and variantes_desactualizadas(instance):
+        encolar_variantes(instance)
+
+
+for modelo in (Perfil, Certificado, Garage):
+    post_save.connect(pedir_variantes, sender=modelo, dispatch_uid=f'cv_variantes_{modelo.__name__}')
+
+
+# ============================================
+# BORRAR ARCHIVOS REEMPLAZADOS
+# ============================================
+
+def recordar_archivos_anteriores(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.pk is None:
+        return
+    campos = [
+        campo.name for campo in sender._meta.concrete_fields
+        if isinstance(campo, models.FileField) and (update_fields is None or campo.name in update_fields)
+    ]
+    if not campos:
+        return
+    anteriores = sender.objects.filter(pk=instance.pk).values(*campos).first() or {}
+    instance._archivos_reemplazados = [
+        (campo, nombre) for campo, nombre in anteriores.items()
+        if nombre and nombre != getattr(instance, campo).name
+    ]
+
+
+def borrar_archivos_reemplazados(sender, instance, **kwargs):
+    # Solo tras el commit: si la transacción falla, la fila sigue apuntando al anterior
+    for campo, nombre in instance.__dict__.pop('_archivos_reemplazados', []):
+        storage = sender._meta.get_field(campo).storage
+        transaction.on_commit(partial(storage.delete, nombre))
+
+
+for modelo in (Perfil, Certificado, Reconocimiento, Garage):
+    pre_save.connect(recordar_archivos_anteriores, sender=modelo, dispatch_uid=f'cv_archivos_pre_{modelo.__name__}')
+    post_save.connect(borrar_archivos_reemplazados, sender=modelo, dispatch_uid=f'cv_archivos_post_{modelo.__name__}')
+
+
+# ============================================
+# MEDIA REPLICADA EN EL ESPEJO
+# ============================================
+
+def invalidar_media_replicada(sender, nombres, **kwargs):
+    # Mientras el archivo estaba pendiente, las páginas y secciones se cachearon
+    # con su URL local (/media/...). Se invalidan los modelos dueños de la
+    # carpeta: cubre el original y sus variantes, que viven al lado
+    afectados = {
+        modelo._meta.model_name
+        for modelo in MODELOS_CV
+        for campo in modelo._meta.concrete_fields
+        if isinstance(campo, models.FileField) and isinstance(campo.upload_to, str)
+        and any(nombre.startswith(campo.upload_to) for nombre in nombres)
+    }
+    for modelo in sorted(afectados):
+        incrementar_version(modelo)
+
+
+archivos_replicados.connect(invalidar_media_replicada, dispatch_uid='cv_cache_media_replicada')
@@ -0,0 +1,225 @@
+/**
+ * ========================================
+ * HOJA DE VIDA - INTERACCIÓN DE cv.html
+ * Tema, idioma, pestañas, filtros, modales y PDF
+ * ========================================
+ */
+
+// ===== GENERAR ICONOS TECNOLÓGICOS FLOTANTES =====
+const particlesBg = document.getElementById('particlesBg');
+
+const techIcons = [
+    { icon: 'bi-code-slash', class: 'code' },
+    { icon: 'bi-code-square', class: 'code' },
+    { icon: 'bi-terminal', class: 'code' },
+    { icon: 'bi-file-code', class: 'code' },
+    { icon: 'bi-braces', class: 'code' },
+    { icon: 'bi-database', class: 'database' },
+    { icon: 'bi-server', class: 'database' },
+    { icon: 'bi-hdd', class: 'database' },
+    { icon: 'bi-hdd-network', class: 'database' },
+    { icon: 'bi-cloud', class: 'cloud' },
+    { icon: 'bi-cloud-upload', class: 'cloud' },
+    { icon: 'bi-diagram-3', class: 'network' },
+    { icon: 'bi-router', class: 'network' },
+    { icon: 'bi-wifi', class: 'network' },
+    { icon: 'bi-cpu', class: 'code' },
+    { icon: 'bi-memory', class: 'code' },
+    { icon: 'bi-motherboard', class: 'code' },
+    { icon: 'bi-pc-display', class: 'network' },
+    { icon: 'bi-laptop', class: 'network' },
+    { icon: 'bi-shield-check', class: 'security' },
+    { icon: 'bi-lock', class: 'security' },
+    { icon: 'bi-key', class: 'security' },
+    { icon: 'bi-robot', class: 'ai' },
+    { icon: 'bi-cpu-fill', class: 'ai' },
+    { icon: 'bi-git', class: 'code' },
+    { icon: 'bi-github', class: 'code' },
+    { icon: 'bi-terminal-fill', class: 'code' },
+    { icon: 'bi-globe', class: 'cloud' },
+    { icon: 'bi-browser-chrome', class: 'cloud' },
+    { icon: 'bi-stack', class: 'database' }
+];
+
+for (let i = 0; i < 50; i++) {
+    const randomIcon = techIcons[Math.floor(Math.random() * techIcons.length)];
+    const icon = document.createElement('i');
+    icon.className = `bi ${randomIcon.icon} tech-icon ${randomIcon.class}`;
+    icon.style.left = Math.random() * 100 + '%';
+    icon.style.animationDelay = Math.random() * 25 + 's';
+    icon.style.animationDuration = (Math.random() * 20 + 20) + 's';
+    icon.style.fontSize = (Math.random() * 1.5 + 1.5) + 'rem';
+    particlesBg.appendChild(icon);
+}
+
+// ===== MODO OSCURO =====
+let isDarkMode = localStorage.getItem('darkMode') === 'true';
+
+function toggleTheme() {
+    isDarkMode = !isDarkMode;
+    document.body.classList.toggle('dark-mode', isDarkMode);
+    document.getElementById('themeIcon').className = isDarkMode ? 'bi bi-sun-fill' : 'bi bi-moon-stars-fill';
+    localStorage.setItem('darkMode', isDarkMode);
+}
+
+if (isDarkMode) {
+    document.body.classList.add('dark-mode');
+    document.getElementById('themeIcon').className = 'bi bi-sun-fill';
+}
+
+// ===== MULTI-IDIOMA =====
+let currentLang = localStorage.getItem('lang') || 'es';
+
+function toggleLang() {
+    currentLang = currentLang === 'es' ? 'en' : 'es';
+    localStorage.setItem('lang', currentLang);
+    document.getElementById('langText').textContent = currentLang === 'es' ? 'EN' : 'ES';
+    updateLanguage();
+}
+
+function updateLanguage() {
+    document.querySelectorAll('[data-es][data-en]').forEach(el => {
+        const attr = el.hasAttribute('data-es-placeholder') ? 'placeholder' : 'textContent';
+        if (attr === 'placeholder') {
+            el.placeholder = currentLang === 'es' ? el.getAttribute('data-es-placeholder') : el.getAttribute('data-en-placeholder');
+        } else {
+            el.textContent = currentLang === 'es' ? el.getAttribute('data-es') : el.getAttribute('data-en');
+        }
+    });
+}
+
+if (currentLang === 'en') {
+    document.getElementById('langText').textContent = 'ES';
+    updateLanguage();
+}
+
+// ===== BÚSQUEDA =====
+function filterCards(section) {
+    const input = document.getElementById(section + 'Search');
+    const filter = input.value.toLowerCase();
+    const grid = document.getElementById(section + 'Grid');
+    const cards = grid.getElementsByClassName('fancy-card');
+
+    Array.from(cards).forEach(card => {
+        const searchText = card.getAttribute('data-search') || '';
+        card.style.display = searchText.includes(filter) ? '' : 'none';
+    });
+}
+
+// ===== NÚMEROS ANIMADOS =====
+document.addEventListener('DOMContentLoaded', function() {
+    // Aplicar width a las barras de progreso desde data-attribute
+    document.querySelectorAll('.skill-progress').forEach(bar => {
+        const width = bar.getAttribute('data-width');
+        if (width) {
+            bar.style.width = width + '%';
+        }
+    });
+
+    const animateNumber = (element) => {
+        const target = parseInt(element.textContent);
+        const duration = 2000;
+        const increment = target / (duration / 16);
+        let current = 0;
+
+        const timer = setInterval(() => {
+            current += increment;
+            if (current >= target) {
+                element.textContent = target;
+                clearInterval(timer);
+            } else {
+                element.textContent = Math.floor(current);
+            }
+        }, 16);
+    };
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                animateNumber(entry.target);
+                observer.unobserve(entry.target);
+            }
+        });
+    }, { threshold: 0.5 });
+
+    document.querySelectorAll('.stat-number').forEach(num => {
+        observer.observe(num);
+    });
+
+    // TECNOLOGÍAS
+    const techs = document.querySelectorAll('.project-tech');
+    techs.forEach(c => {
+        const t = c.getAttribute('data-tech');
+        if (t) {
+            const items = t.split(',');
+            c.innerHTML = items.map(i => `<span class="badge" style="background: linear-gradient(135deg, var(--secondary), var(--purple)); margin-right: 5px; margin-bottom: 5px;">${i.trim()}</span>`).join('');
+        }
+    });
+});
+
+function switchTab(viewId, btn) {
+    document.querySelectorAll('.page-section').forEach(el => el.classList.remove('active'));
+    document.getElementById(viewId).classList.add('active');
+
+    if(btn) {
+        document.querySelectorAll('.nav-btn').forEach(b => b.classList.remove('active'));
+        btn.classList.add('active');
+    }
+
+    if (window.innerWidth < 992) toggleSidebar();
+}
+
+function toggleSidebar() {
+    document.getElementById('sidebar').classList.toggle('active');
+}
+
+const previewModal = new bootstrap.Modal(document.getElementById('previewModal'));
+
+function openModal(url) {
+    const img = document.getElementById('modalImg');
+    const pdf = document.getElementById('modalPdf');
+
+    img.src = '';
+    pdf.src = '';
+    img.style.display = 'none';
+    pdf.style.display = 'none';
+
+    if (url.toLowerCase().endsWith('.pdf')) {
+        pdf.src = url;
+        pdf.style.display = 'block';
+    } else {
+        img.src = url;
+        img.style.display = 'block';
+    }
+
+    previewModal.show();
+}
+
+// ===== FORMULARIO DE CONTACTO =====
+function sendContactForm(e) {
+    e.preventDefault();
+    const name = document.getElementById('contactName').value;
+    const email = document.getElementById('contactEmail').value;
+    const message = document.getElementById('contactMessage').value;
+    
+    // Aquí puedes integrar con EmailJS o tu backend
+    const whatsappMsg = `Hola, soy ${name} (${email}). ${message}`;
+    const whatsappUrl = `https://wa.me/593${document.body.dataset.telefono}?text=${encodeURIComponent(whatsappMsg)}`;
+    
+    window.open(whatsappUrl, '_blank');
+    bootstrap.Modal.getInstance(document.getElementById('contactModal')).hide();
+    
+    // Limpiar formulario
+    document.getElementById('contactName').value = '';
+    document.getElementById('contactEmail').value = '';
+    document.getElementById('contactMessage').value = '';
+}
+
+function generatePDF() {
+    // El PDF se genera en el servidor (WeasyPrint) con las secciones marcadas
+    const params = new URLSearchParams();
+    document.querySelectorAll('.pdf-chk:checked').forEach(chk => params.append('secciones', chk.value));
+
+    bootstrap.Modal.getInstance(document.getElementById('pdfOptionsModal')).hide();
+    window.open(`${document.body.dataset.urlPdf}?${params.toString()}`, '_blank');
+}
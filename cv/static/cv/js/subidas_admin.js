@@ -0,0 +1,81 @@
+/**
+ * ========================================
+ * SUBIDAS GRANDES EN EL ADMIN
+ * Checksum en el navegador + progreso del servidor
+ * ========================================
+ */
+
+(function () {
+    'use strict';
+
+    const INTERVALO_PROGRESO = 500; // ms
+
+    /**
+     * 🔐 sha256 del archivo elegido → campo oculto '<nombre>__sha256'.
+     * El servidor lo compara con el que calcula mientras recibe los bloques.
+     */
+    async function calcularChecksum(input) {
+        let oculto = input.form.querySelector(`input[name="${input.name}__sha256"]`);
+        if (!oculto) {
+            oculto = document.createElement('input');
+            oculto.type = 'hidden';
+            oculto.name = `${input.name}__sha256`;
+            // Antes del archivo: así llega primero en el multipart
+            input.before(oculto);
+        }
+        oculto.value = '';
+
+        const archivo = input.files[0];
+        if (!archivo || !window.crypto || !crypto.subtle) return;
+
+        input.dataset.calculando = '1';
+        const digest = await crypto.subtle.digest('SHA-256', await archivo.arrayBuffer());
+        oculto.value = Array.from(new Uint8Array(digest))
+            .map((byte) => byte.toString(16).padStart(2, '0'))
+            .join('');
+        delete input.dataset.calculando;
+    }
+
+    /**
+     * 📊 Barra de progreso alimentada por /subidas/<id>/
+     */
+    function mostrarProgreso(form, urlProgreso) {
+        const id = (crypto.randomUUID && crypto.randomUUID()) || String(Date.now());
+        const accion = new URL(form.action || window.location.href, window.location.href);
+        accion.searchParams.set('X-Progress-ID', id);
+        form.action = accion.toString();
+
+        const barra = document.createElement('progress');
+        barra.max = 100;
+        barra.value = 0;
+        barra.style.width = '100%';
+        form.prepend(barra);
+
+        const consultar = async () => {
+            const respuesta = await fetch(urlProgreso.replace('ID', id), { credentials: 'same-origin' });
+            if (respuesta.ok) {
+                const progreso = await respuesta.json();
+                if (progreso.total) barra.value = Math.round((progreso.recibido / progreso.total) * 100);
+                if (progreso.terminado) return;
+            }
+            setTimeout(consultar, INTERVALO_PROGRESO);
+        };
+        setTimeout(consultar, INTERVALO_PROGRESO);
+    }
+
+    document.addEventListener('DOMContentLoaded', () => {
+        document.querySelectorAll('input[type="file"][data-progreso]').forEach((input) => {
+            input.addEventListener('change', () => calcularChecksum(input));
+
+            input.form.addEventListener('submit', (evento) => {
+                // Espera el checksum si el archivo todavía se está leyendo
+                if (input.dataset.calculando) {
+                    evento.preventDefault();
+                    setTimeout(() => input.form.requestSubmit(evento.submitter), 200);
+                    return;
+                }
+                if (input.files.length) mostrarProgreso(input.form, input.dataset.progreso);
+            });
+        });
+    });
+})();
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import threading
+import time
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.dispatch import Signal
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from .subidas import PREFIJO_PARTE
+
+logger = logging.getLogger(__name__)
+
+# Se envía tras cada pasada de sincronizar() con los nombres que quedaron
+# en el espejo (nombres=[...]): hasta ahí url() daba la URL local
+archivos_replicados = Signal()
+
+
+# ============================================
+# STORAGE LOCAL CON ESPEJO REMOTO (WRITE-BEHIND)
+# ============================================
+
+class AlmacenamientoEspejo(FileSystemStorage):
+    """
+    Guarda los archivos en disco local con nombre derivado de su contenido
+    (sha256) y los replica después en un storage remoto (Azure en producción,
+    InMemoryStorage en pruebas).
+
+    - save() retorna apenas termina la escritura local.
+    - Cada escritura o borrado deja una tarea en <location>/.espejo/; un hilo
+      en segundo plano las aplica en el remoto. `manage.py sincronizar_espejo`
+      vacía las que queden tras un reinicio.
+    - url() apunta al remoto cuando el archivo ya está replicado (y se
+      memoriza por proceso) y al servidor local mientras siga pendiente;
+      al replicarse se avisa con archivos_replicados.
+    - open() lee del disco y, para archivos que solo existen en el remoto
+      (subidos antes de este backend), del espejo.
+    """
+
+    CARPETA_TAREAS = '.espejo'
+    MAX_URLS_MEMORIZADAS = 10000
+    # Una tarea tomada por un proceso que murió se libera pasado este tiempo
+    TAREA_VENCIDA = 10 * 60
+
+    def __init__(self, espejo=None, opciones_espejo=None, hilo=True, **kwargs):
+        super().__init__(**kwargs)
+        self._clase_espejo = espejo
+        self._opciones_espejo = opciones_espejo or {}
+        self._usar_hilo = hilo
+        self._hilo = None
+        self._candado = threading.Lock()
+        self._despertar = threading.Event()
+        self.memorizar_urls = True
+        self._urls = {}
+
+    @cached_property
+    def espejo(self):
+        if not self._clase_espejo:
+            return None
+        return import_string(self._clase_espejo)(**self._opciones_espejo)
+
+    # ---------- escritura local con nombre por contenido ----------
+
+    def _save(self, name, content):
+        carpeta, original = posixpath.split(name)
+        extension = os.path.splitext(original)[1].lower()
+
+        # Las subidas en streaming (cv.subidas) ya están en disco: esto es un
+        # rename y el sha256 viene calculado mientras llegaban los bloques
+        temporal = super()._save(posixpath.join(carpeta, f'{PREFIJO_PARTE}{uuid.uuid4().hex}{extension}'), content)
+        hexdigest = getattr(content, 'sha256', None)
+        if hexdigest is None:
+            digest = hashlib.sha256()
+            with open(self.path(temporal), 'rb') as archivo:
+                for bloque in iter(lambda: archivo.read(64 * 1024), b''):
+                    digest.update(bloque)
+            hexdigest = digest.hexdigest()
+
+        # Mismo contenido subido dos veces → nombres distintos, para que
+        # borrar uno nunca afecte al otro
+        final = self.get_available_name(posixpath.join(carpeta, f'{hexdigest[:32]}{extension}'))
+        os.replace(self.path(temporal), self.path(final))
+
+        self._encolar('guardar', final)
+        return final
+
+    def delete(self, name):
+        super().delete(name)
+        self._urls.pop(name, None)
+        self._encolar('borrar', name)
+
+    def open(self, name, mode='rb'):
+        if self.espejo is not None and 'r' in mode and not super().exists(name):
+            return self.espejo.open(name, mode)
+        return super().open(name, mode)
+
+    def url(self, name):
+        # Los nombres dependen del contenido: una vez replicado, la URL de un
+        # nombre no cambia y se puede memorizar entre requests
+        url = self._urls.get(name)
+        if url is not None:
+            return url
+
+        if self.espejo is None:
+            url = super().url(name)
+        elif self.pendiente(name):
+            # Todavía no está en el remoto: URL local y sin memorizar
+            return super().url(name)
+        else:
+            url = self.espejo.url(name)
+
+        if self.memorizar_urls and not getattr(self.espejo, 'expiration_secs', None):
+            if len(self._urls) >= self.MAX_URLS_MEMORIZADAS:
+                self._urls.clear()
+            self._urls[name] = url
+        return url
+
+    # ---------- cola de replicación ----------
+
+    @property
+    def carpeta_tareas(self):
+        return os.path.join(self.location, self.CARPETA_TAREAS)
+
+    def _ruta_tarea(self, operacion, name):
+        clave = hashlib.sha1(f'{operacion}:{name}'.encode()).hexdigest()
+        return os.path.join(self.carpeta_tareas, f'{clave}.json')
+
+    def pendiente(self, name):
+        return os.path.exists(self._ruta_tarea('guardar', name))
+
+    def _encolar(self, operacion, name):
+        if self.espejo is None:
+            return
+        os.makedirs(self.carpeta_tareas, exist_ok=True)
+        ruta = self._ruta_tarea(operacion, name)
+        temporal = f'{ruta}.{uuid.uuid4().hex}.tmp'
+        with open(temporal, 'w') as archivo:
+            json.dump({'operacion': operacion, 'nombre': name}, archivo)
+        os.replace(temporal, ruta)
+        self._iniciar_hilo()
+
+    def _iniciar_hilo(self):
+        if not self._usar_hilo:
+            return
+        with self._candado:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._bucle, name='espejo-media', daemon=True)
+                self._hilo.start()
+        self._despertar.set()
+
+    def _bucle(self):
+        while True:
+            # Además de despertar con cada tarea, reintenta cada 30 s
+            self._despertar.wait(timeout=30)
+            self._despertar.clear()
+            try:
+                self.sincronizar()
+            except Exception:
+                logger.exception('Error replicando media en el espejo')
+
+    def tareas(self):
+        try:
+            nombres = [n for n in os.listdir(self.carpeta_tareas) if n.endswith('.json')]
+        except FileNotFoundError:
+            return []
+        rutas = [os.path.join(self.carpeta_tareas, n) for n in nombres]
+        return sorted(rutas, key=lambda ruta: os.stat(ruta).st_mtime_ns)
+
+    def liberar_vencidas(self):
+        """Quita el candado de tareas tomadas por un proceso que no terminó"""
+        limite = time.time() - self.TAREA_VENCIDA
+        try:
+            nombres = os.listdir(self.carpeta_tareas)
+        except FileNotFoundError:
+            return
+        for nombre in nombres:
+            ruta = os.path.join(self.carpeta_tareas, nombre)
+            if nombre.endswith('.tomada') and os.stat(ruta).st_mtime < limite:
+                os.remove(ruta)
+
+    def sincronizar(self, limite=None):
+        """Aplica las tareas pendientes en el espejo. Devuelve (hechas, fallidas)"""
+        hechas = fallidas = 0
+        replicados = []
+        for ruta in self.tareas()[:limite]:
+            # La tarea se toma creando su candado en exclusiva; el .json sigue
+            # ahí hasta terminar, así url() la sigue viendo como pendiente
+            candado = f'{ruta}.tomada'
+            try:
+                os.close(os.open(candado, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                continue
+
+            try:
+                with open(ruta) as archivo:
+                    tarea = json.load(archivo)
+            except FileNotFoundError:
+                # Otro proceso la terminó entre el listado y el candado
+                os.remove(candado)
+                continue
+
+            try:
+                self._aplicar(tarea['operacion'], tarea['nombre'])
+            except Exception:
+                logger.exception('No se pudo replicar %s', ruta)
+                fallidas += 1
+            else:
+                hechas += 1
+                os.remove(ruta)
+                if tarea['operacion'] == 'guardar':
+                    replicados.append(tarea['nombre'])
+            finally:
+                os.remove(candado)
+
+        if replicados:
+            archivos_replicados.send(sender=type(self), nombres=replicados)
+        return hechas, fallidas
+
+    def _aplicar(self, operacion, name):
+        if operacion == 'borrar':
+            self.espejo.delete(name)
+            return
+
+        if not super().exists(name) or self.espejo.exists(name):
+            # Se borró antes de replicarse, o ya está arriba (mismo contenido)
+            return
+        with super().open(name, 'rb') as archivo:
+            guardado = self.espejo.save(name, File(archivo, name=name))
+        if guardado != name:
+            self.espejo.delete(guardado)
+            raise RuntimeError(f'El espejo renombró {name} a {guardado}')
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+
+# ============================================
+# SUBIDAS EN STREAMING (SIN BUFFER EN MEMORIA)
+# ============================================
+
+# Cada cuántos bytes se publica el progreso en la cache
+PASO_PROGRESO = 1024 * 1024
+# El progreso de una subida abandonada desaparece solo
+DURACION_PROGRESO = 60 * 60
+# Partes a medio escribir (subidas en curso y saves antes del rename);
+# `limpiar_media_huerfana` borra las que quedaron de un worker que murió
+PREFIJO_PARTE = '.subiendo-'
+
+
+def clave_progreso(id_subida):
+    return f'cv:subida:{id_subida}'
+
+
+def leer_progreso(id_subida):
+    return cache.get(clave_progreso(id_subida))
+
+
+def carpeta_subidas():
+    """
+    Las partes se escriben dentro de MEDIA_ROOT (en un archivo oculto) para
+    que el storage local las mueva con un rename en vez de copiarlas.
+    """
+    storage = storages['default']
+    if isinstance(storage, FileSystemStorage):
+        os.makedirs(storage.location, exist_ok=True)
+        return storage.location
+    return None
+
+
+class ArchivoEnStreaming(TemporaryUploadedFile):
+    """
+    TemporaryUploadedFile escrito por bloques que además lleva el sha256 y
+    los bytes recibidos; el storage usa el digest sin volver a leer el archivo.
+    """
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None, carpeta=None):
+        _, extension = os.path.splitext(name)
+        archivo = tempfile.NamedTemporaryFile(prefix=PREFIJO_PARTE, suffix=f'.upload{extension}', dir=carpeta)
+        UploadedFile.__init__(self, archivo, name, content_type, size, charset, content_type_extra)
+        self._digest = hashlib.sha256()
+        self.sha256 = None
+
+    def escribir(self, bloque):
+        self.file.write(bloque)
+        self._digest.update(bloque)
+
+    def cerrar_escritura(self, tamano):
+        self.file.flush()
+        self.file.seek(0)
+        self.size = tamano
+        self.sha256 = self._digest.hexdigest()
+
+
+class SubidaEnStreamingHandler(FileUploadHandler):
+    """
+    Reemplaza a los handlers de Django: cada bloque (64 KB) se escribe al
+    disco apenas llega, así la memoria del worker no crece con el archivo.
+    Si la petición trae ?X-Progress-ID=<id>, el avance queda en la cache
+    para `cv.views.subida_progreso`.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.total = content_length
+        self.recibido = 0
+        self.publicado = 0
+        self.id_subida = self.request.GET.get('X-Progress-ID') if self.request else None
+        self._publicar()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.tamano = 0
+        self.archivo = ArchivoEnStreaming(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra,
+            carpeta=carpeta_subidas(),
+        )
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.archivo.escribir(raw_data)
+        self.tamano += len(raw_data)
+        self.recibido += len(raw_data)
+        if self.recibido - self.publicado >= PASO_PROGRESO:
+            self._publicar()
+
+    def file_complete(self, file_size):
+        self.archivo.cerrar_escritura(file_size)
+        return self.archivo
+
+    def upload_complete(self):
+        self._publicar(terminado=True)
+
+    def upload_interrupted(self):
+        # La parte escrita se borra ya (NamedTemporaryFile se elimina al cerrarse)
+        archivo = getattr(self, 'archivo', None)
+        if archivo is not None:
+            archivo.close()
+        self._publicar(terminado=True, interrumpido=True)
+
+    def _publicar(self, terminado=False, interrumpido=False):
+        if not self.id_subida:
+            return
+        self.publicado = self.recibido
+        cache.set(clave_progreso(self.id_subida), {
+            'recibido': self.recibido,
+            'total': self.total,
+            'terminado': terminado,
+            'interrumpido': interrumpido,
+        }, DURACION_PROGRESO)
+
+
+def checksum_valido(archivo, esperado):
+    """Sin checksum del cliente no hay nada que comparar"""
+    if not esperado or getattr(archivo, 'sha256', None) is None:
+        return True
+    return archivo.sha256 == esperado.strip().lower()
@@ -0,0 +1,68 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from cv.estaticos import CRITICOS
+
+register = template.Library()
+
+# Poppins (títulos, pesos 700/800/900): sale de los estáticos propios en cuanto
+# `manage.py subsetear_estaticos` genera sus recortes; hasta entonces, de Google
+# Fonts pidiendo solo esos pesos
+POPPINS_PROPIA = 'cv/fonts/poppins/poppins.css'
+POPPINS_GOOGLE = 'https://fonts.googleapis.com/css2?family=Poppins:wght@700;800;900&display=swap'
+
+
+@lru_cache(maxsize=None)
+def _critico(nombre):
+    """Contenido generado por collectstatic (cv.estaticos.EstaticosCV), una lectura por proceso"""
+    try:
+        with staticfiles_storage.open(nombre) as archivo:
+            return archivo.read().decode('utf-8')
+    except OSError:
+        return None
+
+
+@register.simple_tag
+def estilos_criticos(nombre):
+    """
+    Con collectstatic hecho: el CSS crítico en línea y las hojas completas
+    cargadas sin bloquear el primer pintado. En desarrollo o sin el archivo
+    crítico, <link> normales.
+    """
+    hojas = [static(hoja) for hoja in CRITICOS[nombre]['hojas']]
+    critico = None if settings.DEBUG else _critico(nombre)
+    if not critico:
+        return format_html_join('\n    ', '<link href="{}" rel="stylesheet">', ((url,) for url in hojas))
+
+    asincronas = format_html_join(
+        '\n    ',
+        '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">',
+        ((url,) for url in hojas),
+    )
+    sin_js = format_html_join('', '<link href="{}" rel="stylesheet">', ((url,) for url in hojas))
+    return format_html(
+        '<style>{}</style>\n    {}\n    <noscript>{}</noscript>',
+        mark_safe(critico), asincronas, sin_js,
+    )
+
+
+@lru_cache(maxsize=None)
+def _poppins_propia():
+    return finders.find(POPPINS_PROPIA) is not None
+
+
+@register.simple_tag
+def fuente_titulos():
+    if _poppins_propia():
+        return format_html('<link href="{}" rel="stylesheet">', static(POPPINS_PROPIA))
+    return format_html(
+        '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>\n    <link href="{}" rel="stylesheet">',
+        POPPINS_GOOGLE,
+    )
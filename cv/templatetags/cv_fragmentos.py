@@ -0,0 +1,54 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+
+from cv.cache import clave_fragmento
+
+register = template.Library()
+
+
+class SeccionCacheadaNode(template.Node):
+
+    def __init__(self, nodelist, nombre, modelos):
+        self.nodelist = nodelist
+        self.nombre = nombre
+        self.modelos = modelos
+
+    def render(self, context):
+        versiones = context.get('versiones_modelos')
+        if versiones is None:
+            # Sin versiones en el contexto (PDF, benchmark) no hay qué cachear
+            return self.nodelist.render(context)
+
+        perfil = context.get('perfil')
+        nombre = self.nombre.resolve(context)
+        clave = clave_fragmento(
+            nombre, getattr(perfil, 'pk', None),
+            [versiones[modelo.resolve(context)] for modelo in self.modelos],
+        )
+        contenido = cache.get(clave)
+        if contenido is None:
+            contenido = self.nodelist.render(context)
+            cache.set(clave, contenido, settings.CV_CACHE_TIMEOUT)
+        return contenido
+
+
+@register.tag
+def seccion_cacheada(parser, token):
+    """
+    {% seccion_cacheada 'garage' 'garage' 'perfil' %}...{% endseccion_cacheada %}
+
+    Cachea el HTML del bloque con el nombre dado y lo reutiliza mientras no
+    cambie la versión de ninguno de los modelos listados (cv.cache). Editar
+    un producto del garage solo vuelve a renderizar esa sección.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' necesita un nombre y al menos un modelo")
+    nodelist = parser.parse(('endseccion_cacheada',))
+    parser.delete_first_token()
+    return SeccionCacheadaNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
@@ -0,0 +1,50 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from cv.imagenes import formatos_disponibles, variantes_de
+
+register = template.Library()
+
+TARJETA = '(max-width: 768px) 100vw, 400px'
+
+
+def _variante_para(jpg, ancho):
+    """El JPEG más chico que cubre `ancho` (el más grande si ninguno llega)"""
+    suficientes = [clave for clave in jpg if int(clave) >= ancho] if ancho else []
+    return jpg[min(suficientes, key=int) if suficientes else max(jpg, key=int)]
+
+
+@register.simple_tag
+def imagen_responsiva(instancia, campo_imagen, alt='', clase='', sizes=TARJETA, ancho=None):
+    """
+    <picture> con una <source> por formato moderno y un <img> JPEG de
+    respaldo con srcset. Sin variantes generadas se usa el archivo original.
+    `ancho` elige el JPEG del src (el que usan WeasyPrint y los navegadores
+    sin srcset); por defecto, el más grande.
+    """
+    campo = getattr(instancia, campo_imagen)
+    atributos = format_html(' class="{}"', clase) if clase else ''
+    formatos = variantes_de(instancia, campo_imagen)
+    if not formatos:
+        return format_html('<img src="{}" alt="{}"{} loading="lazy">', campo.url, alt, atributos)
+
+    def srcset(nombres):
+        return ', '.join(
+            f'{campo.storage.url(nombre)} {ancho}w'
+            for ancho, nombre in sorted(nombres.items(), key=lambda item: int(item[0]))
+        )
+
+    fuentes = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (mime, srcset(formatos[extension]), sizes)
+            for extension, _, mime, _ in formatos_disponibles()
+            if extension != 'jpg' and extension in formatos
+        ),
+    )
+    jpg = formatos.get('jpg', {})
+    src = campo.storage.url(_variante_para(jpg, ancho)) if jpg else campo.url
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}"{} loading="lazy"></picture>',
+        fuentes, src, srcset(jpg), sizes, alt, atributos,
+    )
@@ -1 +1,1332 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+from concurrent.futures import Future
+from contextlib import closing
+from datetime import date, timedelta
+from importlib import import_module
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage, default_storage, storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.http import HttpRequest
+from django.template import Context, Template
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
+import brotli
+from PIL import Image
+
+from .cache import CARPETA_PLANTILLAS, calcular_huella, leer_estado, modificado_actual, nueva_version, version_actual, versiones_modelos
+from .calentamiento import ESTADO, calentar, calentar_plantillas, cargador_cacheado, plantilla_compilada
+from .estaticos import extraer_critico
+from .imagenes import procesar_variantes, reclamar_variantes
+from .miniaturas import encolar_miniatura, tareas_disponibles, reclamar, procesar, generar_imagen_desde_pdf
+from .models import (
+    Perfil, Educacion, Experiencia, Habilidad,
+    Certificado, Reconocimiento, Proyecto, Garage, TareaVariantes
+)
+from .management.commands import limpiar_media_huerfana
+from .management.commands.sincronizar_replicas import copiar_base
+from .routers import TABLA_VERSION, RouterReplicas, lectura_en_replica
+from . import services
+from .storage import AlmacenamientoEspejo
+from .subidas import ArchivoEnStreaming, SubidaEnStreamingHandler, leer_progreso
+from .templatetags.cv_estaticos import _critico
+
+CACHE_PRUEBAS = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+STORAGES_PRUEBAS = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Los tests no corren collectstatic: sin manifest, estáticos con su nombre
+# original (el storage de media queda como en settings)
+ESTATICOS_SIN_MANIFEST = override_settings(
+    STORAGES={**settings.STORAGES, 'staticfiles': STORAGES_PRUEBAS['staticfiles']},
+)
+
+
+def setUpModule():
+    ESTATICOS_SIN_MANIFEST.enable()
+
+
+def tearDownModule():
+    ESTATICOS_SIN_MANIFEST.disable()
+
+# Perfil + una consulta por cada sección precargada
+PRESUPUESTO_CONSULTAS_CV = 8
+
+
+def crear_perfil(**extra):
+    datos = {
+        'nombre': 'Jean Pierre',
+        'profesion': 'Estudiante de TI',
+        'descripcion': 'Perfil de prueba',
+        'cedula': '1234567890',
+        'fecha_nacimiento': date(2000, 1, 1),
+        'telefono': '0999999999',
+        'email': 'jean@example.com',
+        'ubicacion': 'Manta, Ecuador',
+    }
+    datos.update(extra)
+    return Perfil.objects.create(**datos)
+
+
+def poblar_secciones(perfil, cantidad):
+    for i in range(cantidad):
+        Educacion.objects.create(
+            perfil=perfil, institucion=f'Inst {i}', titulo=f'Título {i}',
+            fecha_inicio=date(2015 + i % 5, 1, 1),
+        )
+        Experiencia.objects.create(
+            perfil=perfil, empresa=f'Empresa {i}', cargo=f'Cargo {i}',
+            fecha_inicio=date(2016 + i % 5, 1, 1), descripcion='—',
+        )
+        Habilidad.objects.create(perfil=perfil, categoria='Backend', nombre=f'Skill {i}', nivel=50, orden=i)
+        Certificado.objects.create(perfil=perfil, titulo=f'Curso {i}', institucion='Inst', fecha=date(2020, 1, 1 + i))
+        Reconocimiento.objects.create(perfil=perfil, titulo=f'Premio {i}', otorgado_por='Org', fecha=date(2021, 1, 1 + i))
+        Proyecto.objects.create(perfil=perfil, nombre=f'Proyecto {i}', descripcion='—', tecnologias='Django')
+        Garage.objects.create(
+            perfil=perfil, nombreproducto=f'Producto {i}', estadoproducto='Bueno',
+            descripcion='—', valordelbien='10.00',
+        )
+
+
+# ============================================
+# TESTS: cv_view
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class CvViewConsultasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def render_cv(self):
+        # El presupuesto es del render; la fecha de modificación se lee de la
+        # base solo con el cache vacío
+        modificado_actual()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('cv'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_respeta_presupuesto_de_consultas(self):
+        poblar_secciones(crear_perfil(), 3)
+        _, consultas = self.render_cv()
+        self.assertLessEqual(consultas, PRESUPUESTO_CONSULTAS_CV)
+
+    def test_consultas_no_crecen_con_los_registros(self):
+        perfil = crear_perfil()
+        poblar_secciones(perfil, 1)
+        _, pocas = self.render_cv()
+        with self.captureOnCommitCallbacks(execute=True):
+            Certificado.objects.filter(perfil=perfil).delete()
+            poblar_secciones(perfil, 10)
+        _, muchas = self.render_cv()
+        self.assertEqual(pocas, muchas)
+
+    def test_totales_desde_listas_precargadas(self):
+        poblar_secciones(crear_perfil(), 4)
+        response, _ = self.render_cv()
+        self.assertEqual(response.context['total_certificados'], 4)
+        self.assertEqual(response.context['total_reconocimientos'], 4)
+        self.assertEqual(response.context['total_proyectos'], 4)
+        self.assertIsInstance(response.context['certificados'], list)
+
+    def test_sin_perfil(self):
+        _, consultas = self.render_cv()
+        self.assertLessEqual(consultas, PRESUPUESTO_CONSULTAS_CV)
+
+
+# ============================================
+# TESTS: fragmentos por sección
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class FragmentosSeccionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.perfil = crear_perfil()
+        poblar_secciones(self.perfil, 2)
+
+    def test_editar_garage_solo_renderiza_su_seccion(self):
+        self.client.get(reverse('cv'))
+        versiones = versiones_modelos()
+
+        # update() no dispara señales: si la sección de habilidades se
+        # volviera a renderizar, mostraría el nombre nuevo
+        Habilidad.objects.filter(perfil=self.perfil).update(nombre='Skill sin señal')
+        producto = Garage.objects.filter(perfil=self.perfil).first()
+        producto.nombreproducto = 'Bicicleta'
+        with self.captureOnCommitCallbacks(execute=True):
+            producto.save()
+
+        contenido = self.client.get(reverse('cv')).content.decode()
+        self.assertIn('Bicicleta', contenido)
+        self.assertNotIn('Skill sin señal', contenido)
+
+        nuevas = versiones_modelos()
+        self.assertNotEqual(nuevas['garage'], versiones['garage'])
+        self.assertEqual(nuevas['habilidad'], versiones['habilidad'])
+
+    def test_cambio_durante_el_render_no_queda_con_la_version_nueva(self):
+        cargar = services.cargar_contexto_cv
+        producto = Garage.objects.filter(perfil=self.perfil).first()
+
+        def cargar_y_editar(slug=None):
+            # Los datos ya se leyeron cuando el admin guarda
+            contexto = cargar(slug)
+            producto.nombreproducto = 'Bicicleta'
+            with self.captureOnCommitCallbacks(execute=True):
+                producto.save()
+            return contexto
+
+        with mock.patch('cv.views.cargar_contexto_cv', cargar_y_editar):
+            self.client.get(reverse('cv'))
+        self.assertContains(self.client.get(reverse('cv')), 'Bicicleta')
+
+    def test_editar_perfil_renderiza_garage(self):
+        self.client.get(reverse('cv'))
+        self.perfil.telefono = '0987654321'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.perfil.save()
+        self.assertContains(self.client.get(reverse('cv')), 'wa.me/5930987654321')
+
+
+# ============================================
+# TESTS: cache de página
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class CvCachePaginaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.perfil = crear_perfil()
+        poblar_secciones(self.perfil, 2)
+
+    def test_acierto_no_consulta_la_base(self):
+        primera = self.client.get(reverse('cv'))
+        with self.assertNumQueries(0):
+            segunda = self.client.get(reverse('cv'))
+        self.assertEqual(primera.content, segunda.content)
+
+    def test_guardar_invalida(self):
+        self.client.get(reverse('cv'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Proyecto.objects.create(perfil=self.perfil, nombre='Proyecto Nuevo', descripcion='—', tecnologias='Go')
+        self.assertContains(self.client.get(reverse('cv')), 'Proyecto Nuevo')
+
+    def test_version_cambia_recien_tras_el_commit(self):
+        etag = self.client.get(reverse('cv'))['ETag']
+        with self.captureOnCommitCallbacks() as pendientes:
+            Proyecto.objects.create(perfil=self.perfil, nombre='Sin commit', descripcion='—', tecnologias='Go')
+            # Antes del commit la versión no cambia: nadie cachea filas a medio guardar
+            self.assertEqual(self.client.get(reverse('cv'))['ETag'], etag)
+        for callback in pendientes:
+            callback()
+        self.assertNotEqual(self.client.get(reverse('cv'))['ETag'], etag)
+
+    def test_eliminar_invalida(self):
+        self.client.get(reverse('cv'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Garage.objects.filter(perfil=self.perfil, nombreproducto='Producto 0').delete()
+        self.assertNotContains(self.client.get(reverse('cv')), 'Producto 0')
+
+
+# ============================================
+# TESTS: GET condicional
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class CvGetCondicionalTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.perfil = crear_perfil()
+
+    def test_envia_validadores(self):
+        for nombre in ('home', 'cv'):
+            response = self.client.get(reverse(nombre))
+            self.assertTrue(response.has_header('ETag'))
+            self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_etag_devuelve_304_sin_consultas(self):
+        etag = self.client.get(reverse('cv'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('cv'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_slug_inexistente_da_404_aunque_el_etag_coincida(self):
+        etag = self.client.get(reverse('cv'))['ETag']
+        for nombre in ('cv_perfil', 'cv_perfil_async'):
+            response = self.client.get(reverse(nombre, args=['nadie']), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 404)
+
+        # Con la página del slug en cache el 304 sigue sin consultas
+        url = reverse('cv_perfil', args=[self.perfil.slug])
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_last_modified_devuelve_304(self):
+        modificado = self.client.get(reverse('home'))['Last-Modified']
+        response = self.client.get(reverse('home'), HTTP_IF_MODIFIED_SINCE=modificado)
+        self.assertEqual(response.status_code, 304)
+
+    def test_huella_depende_del_contenido_y_no_de_la_fecha(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            carpeta = Path(directorio) / 'templates'
+            shutil.copytree(CARPETA_PLANTILLAS, carpeta)
+            huella = calcular_huella(carpeta, '')
+            plantilla = carpeta / 'cv' / 'cv.html'
+
+            # Un checkout o una imagen nueva mueven la fecha sin cambiar nada
+            os.utime(plantilla, (0, 0))
+            self.assertEqual(calcular_huella(carpeta, ''), huella)
+
+            self.assertNotEqual(calcular_huella(carpeta, 'abc123'), huella)
+            # collectstatic con otro CSS crítico o bundles nuevos
+            self.assertNotEqual(calcular_huella(carpeta, '', '{"paths": {"cv/css/cv.css": "cv/css/cv.1.css"}}'), huella)
+            plantilla.write_bytes(plantilla.read_bytes() + b'<!-- cambio -->')
+            self.assertNotEqual(calcular_huella(carpeta, ''), huella)
+
+    def test_huella_incluye_el_manifest_de_estaticos(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            manifest = '{"paths": {"cv/css/cv.css": "cv/css/cv.abc.css"}, "version": "1.1"}'
+            Path(directorio, 'staticfiles.json').write_text(manifest)
+            storages_manifest = {
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+            }
+            with override_settings(STATIC_ROOT=directorio, STORAGES=storages_manifest):
+                self.assertEqual(calcular_huella(version=''), calcular_huella(version='', manifest=manifest))
+        self.assertNotEqual(calcular_huella(version=''), calcular_huella(version='', manifest=manifest))
+
+    def test_cambio_en_el_admin_cambia_el_etag(self):
+        etag = self.client.get(reverse('cv'))['ETag']
+        self.perfil.profesion = 'Ingeniero de Software'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.perfil.save()
+        response = self.client.get(reverse('cv'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+# ============================================
+# TESTS: CV por perfil (slug) y listado
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class CvPorPerfilTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_slug_generado_y_unico(self):
+        primero = crear_perfil(nombre='Jean Pierre', cedula='1111111111')
+        segundo = crear_perfil(nombre='Jean Pierre', cedula='2222222222')
+        self.assertEqual(primero.slug, 'jean-pierre')
+        self.assertEqual(segundo.slug, 'jean-pierre-2')
+
+    def test_migracion_de_slugs_respeta_los_reservados(self):
+        generar_slugs = import_module('cv.migrations.0020_perfil_slug').generar_slugs
+        pdf = crear_perfil(nombre='PDF', cedula='1111111111')
+        jean = crear_perfil(nombre='Jean Pierre', cedula='2222222222')
+        Perfil.objects.filter(pk=pdf.pk).update(slug='temporal')
+
+        generar_slugs(django_apps, None)
+        pdf.refresh_from_db()
+        jean.refresh_from_db()
+        self.assertEqual(pdf.slug, 'pdf-2')
+        self.assertEqual(jean.slug, 'jean-pierre')
+
+    def test_cada_slug_muestra_su_perfil(self):
+        crear_perfil(nombre='Ana Torres', cedula='1111111111')
+        crear_perfil(nombre='Luis Mera', cedula='2222222222')
+        self.assertContains(self.client.get(reverse('cv_perfil', args=['ana-torres'])), 'Ana Torres')
+        response = self.client.get(reverse('cv_perfil', args=['luis-mera']))
+        self.assertContains(response, 'Luis Mera')
+        self.assertNotContains(response, 'Ana Torres')
+
+    def test_slug_inexistente_404(self):
+        self.assertEqual(self.client.get(reverse('cv_perfil', args=['nadie'])).status_code, 404)
+
+    def test_listado_paginado_por_llave(self):
+        for i in range(5):
+            crear_perfil(nombre=f'Perfil {i}', cedula=f'100000000{i}')
+
+        with self.assertNumQueries(1):
+            datos = self.client.get(reverse('perfiles')).json()
+        self.assertEqual(len(datos['perfiles']), 5)
+        self.assertIsNone(datos['siguiente'])
+
+    @mock.patch('cv.views.PERFILES_POR_PAGINA', 2)
+    def test_listado_siguiente_pagina(self):
+        for i in range(5):
+            crear_perfil(nombre=f'Perfil {i}', cedula=f'100000000{i}')
+
+        slugs = []
+        url = reverse('perfiles')
+        while url:
+            datos = self.client.get(url).json()
+            slugs += [p['slug'] for p in datos['perfiles']]
+            url = datos['siguiente']
+        self.assertEqual(slugs, [f'perfil-{i}' for i in range(5)])
+
+
+# ============================================
+# TESTS: planes de consulta
+# ============================================
+class ExplicarConsultasCvTests(TestCase):
+
+    def test_consultas_del_cv_usan_indices(self):
+        perfil = crear_perfil()
+        poblar_secciones(perfil, 3)
+        salida = io.StringIO()
+        call_command('explicar_consultas_cv', slug=perfil.slug, estricto=True, stdout=salida)
+        self.assertNotIn('TEMP B-TREE', salida.getvalue())
+        self.assertNotIn('SCAN', salida.getvalue())
+
+
+# ============================================
+# TESTS: cola de miniaturas
+# ============================================
+class ColaMiniaturasTests(TestCase):
+
+    def setUp(self):
+        self.cert = Certificado.objects.create(
+            perfil=crear_perfil(), titulo='Curso', institucion='Inst',
+            fecha=date(2022, 5, 1), archivo='certificados/curso.pdf',
+        )
+        encolar_miniatura(self.cert)
+
+    def test_reclamar_es_exclusivo(self):
+        self.assertEqual(tareas_disponibles(10), [self.cert.pk])
+        self.assertTrue(reclamar(self.cert.pk))
+        self.assertFalse(reclamar(self.cert.pk))
+        self.assertEqual(tareas_disponibles(10), [])
+
+    @mock.patch('cv.miniaturas.generar_imagen_desde_pdf')
+    def test_procesar_exitoso(self, generar):
+        reclamar(self.cert.pk)
+        self.assertEqual(procesar(self.cert.pk, max_intentos=3), 'lista')
+        generar.assert_called_once()
+        self.cert.refresh_from_db()
+        self.assertEqual(self.cert.estado_imagen, 'lista')
+
+    @mock.patch('cv.miniaturas.generar_imagen_desde_pdf', side_effect=OSError('poppler'))
+    def test_reintentos_y_error(self, generar):
+        reclamar(self.cert.pk)
+        self.assertEqual(procesar(self.cert.pk, max_intentos=2), 'pendiente')
+        self.cert.refresh_from_db()
+        self.assertEqual(self.cert.intentos_imagen, 1)
+        self.assertIsNotNone(self.cert.proximo_intento_imagen)
+        # Con espera programada no vuelve a la cola todavía
+        self.assertEqual(tareas_disponibles(10), [])
+
+        Certificado.objects.filter(pk=self.cert.pk).update(proximo_intento_imagen=None)
+        reclamar(self.cert.pk)
+        self.assertEqual(procesar(self.cert.pk, max_intentos=2), 'error')
+        self.cert.refresh_from_db()
+        self.assertIn('poppler', self.cert.error_imagen)
+
+    def test_certificado_borrado_despues_de_encolar(self):
+        reclamar(self.cert.pk)
+        Certificado.objects.filter(pk=self.cert.pk).delete()
+        self.assertEqual(procesar(self.cert.pk, max_intentos=3), 'borrado')
+
+    def test_certificado_borrado_mientras_se_convierte(self):
+        def borrar_y_fallar(obj):
+            Certificado.objects.filter(pk=obj.pk).delete()
+            # Savepoint: en el worker (autocommit) el error no arrastra la transacción
+            with transaction.atomic():
+                obj.save(update_fields=['imagen'])
+
+        reclamar(self.cert.pk)
+        with mock.patch('cv.miniaturas.generar_imagen_desde_pdf', side_effect=borrar_y_fallar):
+            self.assertEqual(procesar(self.cert.pk, max_intentos=3), 'borrado')
+
+    @override_settings(STORAGES=STORAGES_PRUEBAS)
+    def test_rasteriza_desde_el_archivo_subido(self):
+        pdf = b'%PDF-1.4 contenido'
+        cert = Certificado.objects.get(pk=self.cert.pk)
+        cert.archivo = SimpleUploadedFile('curso.pdf', pdf, content_type='application/pdf')
+        cert.save()
+
+        with mock.patch('pdf2image.convert_from_bytes', return_value=[Image.new('RGB', (20, 30))]) as convertir:
+            generar_imagen_desde_pdf(cert)
+
+        convertir.assert_called_once()
+        self.assertEqual(convertir.call_args.args[0], pdf)
+        self.assertTrue(cert.imagen.storage.exists(cert.imagen.name))
+
+
+class PoolEnElMismoProceso:
+    """Reemplaza al ProcessPoolExecutor: cada tarea corre al enviarla, dentro de la transacción del test"""
+
+    def __init__(self, max_workers=None, initializer=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, funcion, *args):
+        futuro = Future()
+        try:
+            futuro.set_result(funcion(*args))
+        except Exception as exc:
+            futuro.set_exception(exc)
+        return futuro
+
+
+@mock.patch('cv.management.commands.procesar_miniaturas.ThreadPoolExecutor', PoolEnElMismoProceso)
+@mock.patch('cv.management.commands.procesar_miniaturas.connection')
+class ProcesarMiniaturasTests(TestCase):
+
+    def setUp(self):
+        perfil = crear_perfil()
+        self.certs = [
+            Certificado.objects.create(
+                perfil=perfil, titulo=f'Curso {i}', institucion='Inst',
+                fecha=date(2022, 5, 1), archivo=f'certificados/curso{i}.pdf',
+            )
+            for i in range(2)
+        ]
+        for cert in self.certs:
+            encolar_miniatura(cert)
+
+    def test_una_tarea_que_falla_no_corta_el_worker(self, conexion):
+        def procesar_o_fallar(pk, max_intentos):
+            if pk == self.certs[0].pk:
+                raise sqlite3.OperationalError('database is locked')
+            return 'lista'
+
+        salida, errores = io.StringIO(), io.StringIO()
+        with mock.patch('cv.management.commands.procesar_miniaturas.procesar', side_effect=procesar_o_fallar), \
+                self.assertLogs('cv.management.commands.procesar_miniaturas', 'ERROR'):
+            call_command('procesar_miniaturas', '--una-vez', '--concurrencia=2', stdout=salida, stderr=errores)
+
+        self.assertIn(f'Certificado {self.certs[0].pk}: falló (1 fallas', errores.getvalue())
+        self.assertIn(f'Certificado {self.certs[1].pk}: lista', salida.getvalue())
+
+
+@mock.patch('cv.management.commands.rellenar_miniaturas.ProcessPoolExecutor', PoolEnElMismoProceso)
+class RellenarMiniaturasTests(TestCase):
+
+    def setUp(self):
+        perfil = crear_perfil()
+        self.certs = [
+            Certificado.objects.create(
+                perfil=perfil, titulo=f'Curso {n}', institucion='Inst',
+                fecha=date(2022, 5, 1), archivo=f'certificados/curso{n}.pdf',
+            )
+            for n in range(4)
+        ]
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.checkpoint = os.path.join(directorio.name, 'checkpoint.json')
+
+    def _rellenar(self, fallan=()):
+        def generar(obj, dpi):
+            if obj.pk in fallan:
+                raise OSError('poppler')
+            Certificado.objects.filter(pk=obj.pk).update(imagen=f'certificados/img/{obj.pk}.jpg')
+
+        with mock.patch('cv.miniaturas.generar_imagen_desde_pdf', side_effect=generar) as convertir:
+            call_command('rellenar_miniaturas', '--checkpoint', self.checkpoint, stdout=io.StringIO())
+        return [llamada.args[0].pk for llamada in convertir.call_args_list]
+
+    def test_checkpoint_no_pasa_de_un_error_y_se_reanuda(self):
+        primero, fallido, tercero, reservado = (c.pk for c in self.certs)
+        # Un worker de procesar_miniaturas tiene este reservado ahora mismo
+        Certificado.objects.filter(pk=reservado).update(
+            estado_imagen='procesando', proximo_intento_imagen=timezone.now() + timedelta(minutes=5),
+        )
+
+        self.assertEqual(self._rellenar(fallan={fallido}), [primero, fallido, tercero])
+        with open(self.checkpoint) as archivo:
+            self.assertEqual(json.load(archivo)['ultimo_pk'], primero)
+        cert = Certificado.objects.get(pk=fallido)
+        self.assertEqual(cert.estado_imagen, 'pendiente')
+        self.assertIn('poppler', cert.error_imagen)
+
+        # Al reanudar se reintenta el que falló; el que ya tiene imagen no se repite
+        Certificado.objects.filter(pk=reservado).update(imagen='certificados/img/hecho.jpg', estado_imagen='lista')
+        self.assertEqual(self._rellenar(), [fallido])
+        self.assertTrue(Certificado.objects.get(pk=fallido).imagen)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+
+# ============================================
+# TESTS: variantes de imagen
+# ============================================
+def png(ancho, alto):
+    buffer = io.BytesIO()
+    Image.new('RGB', (ancho, alto), 'orange').save(buffer, format='PNG')
+    return SimpleUploadedFile('foto.png', buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(CACHES=CACHE_PRUEBAS, STORAGES=STORAGES_PRUEBAS)
+class VariantesImagenTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.perfil = crear_perfil()
+
+    def crear_producto(self, imagen):
+        return Garage.objects.create(
+            perfil=self.perfil, nombreproducto='Bicicleta', estadoproducto='Bueno',
+            descripcion='—', valordelbien='50.00', imagen=imagen,
+        )
+
+    def procesar_cola(self):
+        call_command('procesar_variantes', '--una-vez', stdout=io.StringIO())
+
+    def test_genera_anchos_y_formatos_sin_agrandar(self):
+        producto = self.crear_producto(png(600, 300))
+        self.procesar_cola()
+        producto.refresh_from_db()
+        formatos = producto.imagen_variantes['formatos']
+        self.assertIn('webp', formatos)
+        self.assertEqual(sorted(formatos['jpg'], key=int), ['160', '480', '600'])
+        with producto.imagen.storage.open(formatos['jpg']['160']) as archivo:
+            self.assertEqual(Image.open(archivo).size, (160, 80))
+
+    def test_guardar_solo_encola_y_el_worker_invalida_al_terminar(self):
+        with mock.patch('cv.imagenes.generar_variantes') as generar:
+            producto = self.crear_producto(png(200, 200))
+        generar.assert_not_called()
+        self.assertEqual(producto.imagen_variantes, {})
+        self.assertTrue(TareaVariantes.objects.filter(modelo='Garage', objeto_id=producto.pk).exists())
+
+        antes = versiones_modelos()
+        self.procesar_cola()
+        self.assertFalse(TareaVariantes.objects.exists())
+        self.assertNotEqual(versiones_modelos()['garage'], antes['garage'])
+        self.assertEqual(versiones_modelos()['perfil'], antes['perfil'])
+
+    def test_tarea_pedida_de_nuevo_mientras_se_procesa_no_se_pierde(self):
+        producto = self.crear_producto(png(200, 200))
+        tarea = reclamar_variantes()
+        # Otra imagen subida mientras el worker genera las variantes de la primera
+        producto.imagen = png(300, 300)
+        producto.save()
+        procesar_variantes(tarea)
+        self.assertTrue(TareaVariantes.objects.exists())
+
+        self.procesar_cola()
+        producto.refresh_from_db()
+        self.assertEqual(producto.imagen_variantes['origen'], producto.imagen.name)
+
+    def test_reemplazar_imagen_borra_variantes_anteriores(self):
+        producto = self.crear_producto(png(200, 200))
+        self.procesar_cola()
+        producto.refresh_from_db()
+        anterior = producto.imagen_variantes['formatos']['jpg']['160']
+        producto.imagen = png(300, 300)
+        producto.save()
+        self.procesar_cola()
+        producto.refresh_from_db()
+        self.assertFalse(producto.imagen.storage.exists(anterior))
+        self.assertEqual(producto.imagen_variantes['origen'], producto.imagen.name)
+
+    def test_plantilla_usa_srcset(self):
+        self.crear_producto(png(1200, 800))
+        self.procesar_cola()
+        response = self.client.get(reverse('cv'))
+        self.assertContains(response, '<source type="image/webp"')
+        self.assertContains(response, '960w')
+
+    def test_vista_de_impresion_usa_variantes(self):
+        self.perfil.foto = png(1200, 1200)
+        self.perfil.save()
+        cert = Certificado.objects.create(
+            perfil=self.perfil, titulo='Curso', institucion='Inst', fecha=date(2022, 5, 1),
+            archivo='certificados/curso.pdf', imagen=png(1600, 1200),
+        )
+        self.procesar_cola()
+        self.perfil.refresh_from_db()
+        cert.refresh_from_db()
+
+        contenido = self.client.get(reverse('cv')).content.decode()
+        avatar = re.search(r'class="profile-avatar-print".*?</div>', contenido, re.S).group()
+        certificados = re.search(r'class="print-certificates".*?<!-- MODAL', contenido, re.S).group()
+        foto = self.perfil.foto_variantes['formatos']['jpg']
+        imagen = cert.imagen_variantes['formatos']['jpg']
+
+        # Nunca el original; el avatar (110px) con la de 480 y el certificado con la más grande
+        self.assertNotIn(self.perfil.foto.url, avatar)
+        self.assertIn(f'src="{default_storage.url(foto["480"])}"', avatar)
+        self.assertNotIn(cert.imagen.url, certificados)
+        self.assertIn(f'src="{default_storage.url(imagen["960"])}"', certificados)
+        self.assertIn('loading="lazy"', avatar)
+        self.assertIn('loading="lazy"', certificados)
+
+
+# ============================================
+# TESTS: PDF del CV
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class CvPdfTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.perfil = crear_perfil()
+        poblar_secciones(self.perfil, 2)
+        # WeasyPrint falso: guarda el HTML recibido y devuelve un PDF mínimo
+        self.html_recibido, self.fetchers = [], []
+        weasyprint = mock.Mock()
+        weasyprint.HTML.side_effect = lambda string, base_url, url_fetcher: (
+            self.html_recibido.append(string) or self.fetchers.append(url_fetcher)
+            or mock.Mock(write_pdf=mock.Mock(return_value=b'%PDF-1.7 cv'))
+        )
+        self.weasyprint = weasyprint
+        parche = mock.patch.dict('sys.modules', {'weasyprint': weasyprint})
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_respeta_las_secciones(self):
+        url = reverse('cv_pdf_perfil', args=[self.perfil.slug])
+        response = self.client.get(url, {'secciones': ['skills', 'garage']})
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'%PDF-1.7 cv')
+        html = self.html_recibido[-1]
+        self.assertIn('Habilidades Técnicas', html)
+        self.assertIn('Producto 0', html)
+        self.assertNotIn('Experiencia', html)
+
+    def test_segunda_descarga_sale_del_cache(self):
+        url = reverse('cv_pdf')
+        self.client.get(url, {'secciones': ['cursos']})
+        with self.assertNumQueries(0):
+            self.client.get(url, {'secciones': ['cursos']})
+        self.assertEqual(len(self.html_recibido), 1)
+
+        # Otro conjunto de secciones o un cambio en los datos vuelve a renderizar
+        self.client.get(url, {'secciones': ['proyectos']})
+        with self.captureOnCommitCallbacks(execute=True):
+            Proyecto.objects.create(perfil=self.perfil, nombre='Nuevo', descripcion='—', tecnologias='Go')
+        self.client.get(url, {'secciones': ['cursos']})
+        self.assertEqual(len(self.html_recibido), 3)
+
+    @override_settings(STORAGES=STORAGES_PRUEBAS)
+    def test_media_y_estaticos_no_se_piden_por_http(self):
+        nombre = default_storage.save('certificados/img/curso.jpg', ContentFile(b'jpeg'))
+        self.client.get(reverse('cv_pdf'), {'secciones': ['cursos']})
+        fetcher = self.fetchers[-1]
+
+        recurso = fetcher(f'http://testserver/media/{nombre}')
+        self.assertEqual((recurso['string'], recurso['mime_type']), (b'jpeg', 'image/jpeg'))
+        self.assertTrue(fetcher('http://testserver/static/cv/css/cv.css')['string'])
+        self.weasyprint.default_url_fetcher.assert_not_called()
+
+        # Lo que no es de este sitio sí va por el fetcher de WeasyPrint
+        fetcher('https://espejo.test/media/curso.jpg')
+        self.weasyprint.default_url_fetcher.assert_called_once_with('https://espejo.test/media/curso.jpg')
+
+
+# ============================================
+# TESTS: storage local con espejo
+# ============================================
+class AlmacenamientoEspejoTests(TestCase):
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.storage = AlmacenamientoEspejo(
+            location=directorio.name,
+            base_url='/media/',
+            espejo='django.core.files.storage.InMemoryStorage',
+            opciones_espejo={'base_url': 'https://espejo.test/'},
+            hilo=False,
+        )
+
+    def test_guarda_local_con_nombre_por_contenido(self):
+        nombre = self.storage.save('garage/Foto Original.JPG', ContentFile(b'bytes de imagen'))
+        digest = hashlib.sha256(b'bytes de imagen').hexdigest()[:32]
+        self.assertEqual(nombre, f'garage/{digest}.jpg')
+        self.assertTrue(os.path.exists(self.storage.path(nombre)))
+        # Mismo contenido otra vez: archivo distinto para no compartir borrados
+        self.assertNotEqual(self.storage.save('garage/copia.jpg', ContentFile(b'bytes de imagen')), nombre)
+
+    def test_replica_en_segundo_plano(self):
+        nombre = self.storage.save('certificados/curso.pdf', ContentFile(b'%PDF'))
+        self.assertFalse(self.storage.espejo.exists(nombre))
+        self.assertEqual(self.storage.url(nombre), f'/media/{nombre}')
+
+        self.assertEqual(self.storage.sincronizar(), (1, 0))
+        self.assertTrue(self.storage.espejo.exists(nombre))
+        self.assertEqual(self.storage.url(nombre), f'https://espejo.test/{nombre}')
+
+    def test_borrado_se_replica(self):
+        nombre = self.storage.save('perfil/foto.png', ContentFile(b'png'))
+        self.storage.sincronizar()
+        self.storage.delete(nombre)
+        self.storage.sincronizar()
+        self.assertFalse(self.storage.espejo.exists(nombre))
+
+    def test_lee_del_espejo_archivos_antiguos(self):
+        self.storage.espejo.save('certificados/antiguo.pdf', ContentFile(b'solo en azure'))
+        with self.storage.open('certificados/antiguo.pdf') as archivo:
+            self.assertEqual(archivo.read(), b'solo en azure')
+
+    def test_fallo_del_espejo_deja_la_tarea(self):
+        nombre = self.storage.save('garage/a.jpg', ContentFile(b'a'))
+        with mock.patch.object(self.storage.espejo, 'save', side_effect=OSError('sin red')), \
+                self.assertLogs('cv.storage', level='ERROR'):
+            self.assertEqual(self.storage.sincronizar(), (0, 1))
+        self.assertTrue(self.storage.pendiente(nombre))
+        self.assertEqual(self.storage.sincronizar(), (1, 0))
+
+    def test_url_replicada_se_memoriza(self):
+        nombre = self.storage.save('garage/b.jpg', ContentFile(b'b'))
+        self.storage.sincronizar()
+        with mock.patch.object(self.storage.espejo, 'url', wraps=self.storage.espejo.url) as url_espejo:
+            for _ in range(3):
+                self.storage.url(nombre)
+        url_espejo.assert_called_once_with(nombre)
+
+    @override_settings(CACHES=CACHE_PRUEBAS)
+    def test_replicar_invalida_las_secciones_con_la_url_local(self):
+        cache.clear()
+        nombre = self.storage.save('garage/c.jpg', ContentFile(b'c'))
+        antes = versiones_modelos()
+        self.storage.sincronizar()
+        despues = versiones_modelos()
+        self.assertNotEqual(despues['garage'], antes['garage'])
+        self.assertEqual(despues['certificado'], antes['certificado'])
+
+        # Un borrado replicado no cambia ninguna URL
+        self.storage.delete(nombre)
+        self.storage.sincronizar()
+        self.assertEqual(versiones_modelos(), despues)
+
+
+# ============================================
+# TESTS: media inmutable y limpieza
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS, STORAGES=STORAGES_PRUEBAS)
+class MediaInmutableTests(TestCase):
+
+    def test_reemplazar_archivo_borra_el_anterior(self):
+        rec = Reconocimiento.objects.create(
+            perfil=crear_perfil(), titulo='Premio', otorgado_por='Org', fecha=date(2022, 1, 1),
+            archivo=SimpleUploadedFile('premio.pdf', b'%PDF viejo'),
+        )
+        anterior = rec.archivo.name
+        rec.archivo = SimpleUploadedFile('premio.pdf', b'%PDF nuevo')
+        with self.captureOnCommitCallbacks(execute=True):
+            rec.save()
+        self.assertFalse(rec.archivo.storage.exists(anterior))
+        self.assertTrue(rec.archivo.storage.exists(rec.archivo.name))
+
+    def test_guardar_sin_cambiar_el_archivo_no_borra(self):
+        rec = Reconocimiento.objects.create(
+            perfil=crear_perfil(), titulo='Premio', otorgado_por='Org', fecha=date(2022, 1, 1),
+            archivo=SimpleUploadedFile('premio.pdf', b'%PDF'),
+        )
+        rec.titulo = 'Premio mayor'
+        with self.captureOnCommitCallbacks(execute=True):
+            rec.save()
+        self.assertTrue(rec.archivo.storage.exists(rec.archivo.name))
+
+    def test_media_local_con_hash_es_inmutable(self):
+        with tempfile.TemporaryDirectory() as directorio, self.settings(MEDIA_ROOT=directorio):
+            os.makedirs(os.path.join(directorio, 'garage'))
+            nombre = f'garage/{"a" * 32}.jpg'
+            with open(os.path.join(directorio, nombre), 'wb') as archivo:
+                archivo.write(b'jpg')
+
+            response = self.client.get(f'/media/{nombre}')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertEqual(self.client.get('/media/.espejo/tarea.json').status_code, 404)
+
+    def test_limpia_partes_de_subidas_abandonadas(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            os.makedirs(os.path.join(directorio, 'certificados'))
+            vieja = os.path.join(directorio, 'certificados', '.subiendo-abc.pdf')
+            en_curso = os.path.join(directorio, '.subiendo-def.upload.pdf')
+            for ruta in (vieja, en_curso):
+                with open(ruta, 'wb') as archivo:
+                    archivo.write(b'%PDF parcial')
+            hace_dos_dias = (timezone.now() - timedelta(days=2)).timestamp()
+            os.utime(vieja, (hace_dos_dias, hace_dos_dias))
+
+            local = {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': directorio}}
+            with override_settings(STORAGES={**STORAGES_PRUEBAS, 'default': local}):
+                salida = io.StringIO()
+                call_command('limpiar_media_huerfana', '--destino', 'local', stdout=salida)
+
+            self.assertFalse(os.path.exists(vieja))
+            self.assertTrue(os.path.exists(en_curso))
+            self.assertIn('1 subidas incompletas borradas', salida.getvalue())
+
+    def test_limpia_media_huerfana(self):
+        rec = Reconocimiento.objects.create(
+            perfil=crear_perfil(), titulo='Premio', otorgado_por='Org', fecha=date(2022, 1, 1),
+            archivo=SimpleUploadedFile('premio.pdf', b'%PDF'),
+        )
+        storage = rec.archivo.storage
+        huerfano = storage.save('reconocimientos/olvidado.pdf', ContentFile(b'%PDF huerfano'))
+
+        salida = io.StringIO()
+        with mock.patch.object(limpiar_media_huerfana, 'referenciados', wraps=limpiar_media_huerfana.referenciados) as consulta:
+            call_command('limpiar_media_huerfana', '--dias-gracia', '0', '--dry-run', stdout=salida)
+        self.assertIn(huerfano, salida.getvalue())
+        # Una sola consulta por campo y por lote, no una por archivo
+        self.assertEqual(consulta.call_count, 1)
+        self.assertTrue(storage.exists(huerfano))
+
+        # Con el periodo de gracia por defecto el archivo recién subido se respeta
+        call_command('limpiar_media_huerfana', stdout=io.StringIO())
+        self.assertTrue(storage.exists(huerfano))
+
+        call_command('limpiar_media_huerfana', '--dias-gracia', '0', '--lote', '1', stdout=io.StringIO())
+        self.assertFalse(storage.exists(huerfano))
+        self.assertTrue(storage.exists(rec.archivo.name))
+
+
+# ============================================
+# TESTS: subidas en streaming
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS, STORAGES=STORAGES_PRUEBAS)
+class SubidaEnStreamingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.perfil = crear_perfil()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave'))
+        self.contenido = b'%PDF-1.4 ' + os.urandom(300 * 1024)
+
+    def subir(self, checksum, **extra):
+        return self.client.post(reverse('admin:cv_reconocimiento_add') + '?X-Progress-ID=abc', {
+            'perfil': self.perfil.pk,
+            'titulo': 'Premio',
+            'otorgado_por': 'Org',
+            'fecha': '2022-01-01',
+            'archivo__sha256': checksum,
+            'archivo': SimpleUploadedFile('premio.pdf', self.contenido, 'application/pdf'),
+        }, **extra)
+
+    def test_subida_con_checksum_correcto(self):
+        response = self.subir(hashlib.sha256(self.contenido).hexdigest())
+        self.assertEqual(response.status_code, 302)
+        rec = Reconocimiento.objects.get()
+        with rec.archivo.open('rb') as archivo:
+            self.assertEqual(archivo.read(), self.contenido)
+
+        progreso = leer_progreso('abc')
+        self.assertTrue(progreso['terminado'])
+        self.assertGreaterEqual(progreso['recibido'], len(self.contenido))
+        self.assertEqual(self.client.get(reverse('subida_progreso', args=['abc'])).json(), progreso)
+
+    def test_checksum_distinto_rechaza_el_archivo(self):
+        response = self.subir('0' * 64)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'checksum no coincide')
+        self.assertFalse(Reconocimiento.objects.exists())
+
+    def test_subida_interrumpida_borra_la_parte(self):
+        with tempfile.TemporaryDirectory() as directorio, \
+                mock.patch('cv.subidas.carpeta_subidas', return_value=directorio):
+            handler = SubidaEnStreamingHandler(request=None)
+            handler.handle_raw_input(None, {}, 10, b'limite')
+            with self.assertRaises(StopFutureHandlers):
+                handler.new_file('archivo', 'premio.pdf', 'application/pdf', 10)
+            handler.receive_data_chunk(b'%PDF', 0)
+            self.assertEqual(len(os.listdir(directorio)), 1)
+
+            handler.upload_interrupted()
+            self.assertEqual(os.listdir(directorio), [])
+
+    def test_storage_reutiliza_el_sha256_de_la_subida(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            storage = AlmacenamientoEspejo(location=directorio, base_url='/media/')
+            subida = ArchivoEnStreaming('curso.pdf', 'application/pdf', 0, None, carpeta=directorio)
+            subida.escribir(b'%PDF bloque 1 ')
+            subida.escribir(b'bloque 2')
+            subida.cerrar_escritura(22)
+
+            with mock.patch('cv.storage.hashlib.sha256') as sha256:
+                nombre = storage.save('certificados/curso.pdf', subida)
+            sha256.assert_not_called()
+            self.assertEqual(nombre, f'certificados/{hashlib.sha256(b"%PDF bloque 1 bloque 2").hexdigest()[:32]}.pdf')
+            # Movido con rename: no queda la parte oculta
+            self.assertEqual(sorted(os.listdir(directorio)), ['certificados'])
+            subida.close()
+
+
+# ============================================
+# TESTS: estáticos sin CDN
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class EstaticosPropiosTests(TestCase):
+
+    def test_paginas_sin_cdn(self):
+        crear_perfil()
+        for url in (reverse('home'), reverse('cv')):
+            contenido = self.client.get(url).content.decode()
+            self.assertNotIn('cdn.jsdelivr.net', contenido)
+            self.assertIn('/static/cv/vendor/bootstrap/bootstrap.min.css', contenido)
+            # Sin los recortes de Poppins, lo único externo: sus tres pesos de títulos
+            self.assertEqual(
+                re.findall(r'https://fonts\.googleapis\.com/css2\?[^"]+', contenido),
+                [] if url == reverse('home') else
+                ['https://fonts.googleapis.com/css2?family=Poppins:wght@700;800;900&amp;display=swap'],
+            )
+
+    def test_poppins_propia_reemplaza_a_google_fonts(self):
+        with mock.patch('cv.templatetags.cv_estaticos._poppins_propia', return_value=True):
+            html = Template('{% load cv_estaticos %}{% fuente_titulos %}').render(Context())
+        self.assertIn('/static/cv/fonts/poppins/poppins.css', html)
+        self.assertNotIn('googleapis', html)
+        self.assertNotIn('gstatic', html)
+
+    def test_subconjunto_de_iconos_cubre_las_plantillas(self):
+        salida = io.StringIO()
+        call_command('subsetear_estaticos', '--verificar', stdout=salida)
+        self.assertIn('iconos cubiertos', salida.getvalue())
+
+
+# ============================================
+# TESTS: CSS y JS de cv.html como estáticos
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class BundlesEstaticosTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        _critico.cache_clear()
+        self.addCleanup(_critico.cache_clear)
+
+    def test_extraer_critico(self):
+        css = (
+            ':root{--a:1}.menu{color:red}.menu:hover{color:blue}.pie{color:green}'
+            '#logo img{width:1px}@media (max-width:900px){.menu{display:none}.pie{margin:0}}'
+            '@media print{.menu{display:none}}.oscuro .menu{color:#000}'
+            '@keyframes entrar{from{opacity:0}}.menu-activo{animation:entrar 1s}'
+        )
+        html = '<body><nav class="menu menu-activo"><div id="logo"><img src="x"></div></nav>'
+        critico = extraer_critico([css], html, ["document.body.classList.add('oscuro')"])
+        for esperado in (':root{--a:1}', '.menu{color:red}', '#logo img', '@media (max-width:900px){.menu{display:none}}',
+                         '.oscuro .menu', '@keyframes entrar'):
+            self.assertIn(esperado, critico)
+        for excluido in ('.pie', ':hover', 'print'):
+            self.assertNotIn(excluido, critico)
+
+    def test_cv_sin_estilos_ni_scripts_en_linea(self):
+        perfil = crear_perfil()
+        contenido = self.client.get(reverse('cv')).content.decode()
+        self.assertNotIn('<style>', contenido)
+        self.assertNotIn('function toggleTheme', contenido)
+        self.assertIn('/static/cv/css/cv.css', contenido)
+        self.assertIn('/static/cv/js/cv.js', contenido)
+        self.assertIn(f'data-url-pdf="{reverse("cv_pdf_perfil", args=[perfil.slug])}"', contenido)
+
+    def test_collectstatic_minifica_e_inserta_el_critico(self):
+        with tempfile.TemporaryDirectory() as directorio, self.settings(
+            STATIC_ROOT=directorio,
+            STORAGES={**STORAGES_PRUEBAS, 'staticfiles': {'BACKEND': 'cv.estaticos.EstaticosCV'}},
+            # Sin gzip/Brotli: es lo más lento y no es lo que se prueba
+            WHITENOISE_SKIP_COMPRESS_EXTENSIONS=['css', 'js', 'svg', 'txt', 'woff', 'woff2', 'ttf', 'eot', 'map', 'md', 'html'],
+        ):
+            call_command('collectstatic', '--noinput', verbosity=0)
+            with open(os.path.join(directorio, 'cv/js/cv.js')) as archivo:
+                self.assertNotIn('// ===== ', archivo.read())
+            self.assertTrue(os.path.exists(os.path.join(directorio, 'cv/css/cv.critico.css')))
+
+            crear_perfil()
+            contenido = self.client.get(reverse('cv')).content.decode()
+            self.assertIn('<style>', contenido)
+            self.assertIn('.sidebar{', contenido)
+            self.assertRegex(contenido, r'<link rel="preload" href="/static/cv/css/cv\.[0-9a-f]{12}\.css" as="style"')
+
+
+# ============================================
+# TESTS: compresión del HTML dinámico
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class CompresionMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        poblar_secciones(crear_perfil(), 5)
+
+    def test_brotli_y_reutiliza_la_pagina_cacheada(self):
+        plano = self.client.get(reverse('cv')).content
+
+        response = self.client.get(reverse('cv'), headers={'accept-encoding': 'gzip, deflate, br'})
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plano)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertIn('br nuevo', response['Server-Timing'])
+
+        with mock.patch('cv.middleware.comprimir') as comprimir:
+            response = self.client.get(reverse('cv'), headers={'accept-encoding': 'br'})
+        comprimir.assert_not_called()
+        self.assertIn('br cache', response['Server-Timing'])
+        self.assertEqual(brotli.decompress(response.content), plano)
+
+    def test_gzip_si_brotli_no_se_acepta(self):
+        response = self.client.get(reverse('cv'), headers={'accept-encoding': 'br;q=0, gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'</html>', gzip.decompress(response.content))
+
+    def test_no_comprime_respuestas_pequenas_ni_streaming(self):
+        response = self.client.get(reverse('perfiles'), headers={'accept-encoding': 'br'})
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        with tempfile.TemporaryDirectory() as directorio, self.settings(MEDIA_ROOT=directorio):
+            with open(os.path.join(directorio, 'grande.txt'), 'w') as archivo:
+                archivo.write('x' * 10000)
+            response = self.client.get('/media/grande.txt', headers={'accept-encoding': 'br'})
+            self.assertTrue(response.streaming)
+            self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class EspejoConCliente(InMemoryStorage):
+    """Remoto de prueba que, como AzureStorage, crea su cliente al primer uso"""
+
+    @cached_property
+    def client(self):
+        return object()
+
+
+# ============================================
+# TESTS: plantillas precompiladas
+# ============================================
+class PlantillasCacheadasTests(TestCase):
+
+    def test_calentar_deja_las_plantillas_compiladas(self):
+        cargador = cargador_cacheado()
+        self.assertIsNotNone(cargador)
+        cargador.reset()
+        self.assertFalse(plantilla_compilada('cv/cv.html'))
+
+        tiempos = calentar_plantillas()
+        self.assertIn('cv/cv.html', tiempos)
+        self.assertTrue(plantilla_compilada('cv/cv.html'))
+
+    @override_settings(CACHES=CACHE_PRUEBAS)
+    def test_salud_lista_solo_tras_calentar(self):
+        cache.clear()
+        crear_perfil()
+        with mock.patch.dict(ESTADO, {'listo': False, 'pid': None, 'pasos': {}, 'errores': {}}):
+            self.assertEqual(self.client.get(reverse('salud')).status_code, 503)
+
+            estado = calentar()
+            self.assertEqual(estado['errores'], {})
+            self.assertEqual(set(estado['pasos']), {'urls', 'plantillas', 'storages', 'base_de_datos', 'pagina_cv'})
+
+            response = self.client.get(reverse('salud'))
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json()['listo'])
+
+        # La página quedó en el cache: el primer visitante no la renderiza
+        self.assertIsNotNone(leer_estado(HttpRequest()).contenido)
+
+    def test_calentar_crea_el_espejo_de_media_y_su_cliente(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            storages_espejo = {**settings.STORAGES, 'default': {
+                'BACKEND': 'cv.storage.AlmacenamientoEspejo',
+                'OPTIONS': {'location': directorio, 'espejo': 'cv.tests.EspejoConCliente', 'hilo': False},
+            }}
+            with override_settings(STORAGES=storages_espejo), \
+                    mock.patch.dict(ESTADO, {'listo': False, 'pid': None, 'pasos': {}, 'errores': {}}):
+                self.assertTrue(calentar(pasos=('storages',))['listo'])
+                storage = storages['default']
+                # Ya creados: el primer request no paga la conexión al remoto
+                self.assertIn('espejo', vars(storage))
+                self.assertIn('client', vars(storage.espejo))
+
+    def test_salud_no_lista_si_un_paso_fallo(self):
+        with mock.patch.dict(ESTADO, {'listo': False, 'pid': None, 'pasos': {}, 'errores': {}}):
+            with mock.patch.object(connections['default'], 'ensure_connection', side_effect=OSError('sin disco')):
+                estado = calentar(pasos=('base_de_datos',))
+            self.assertFalse(estado['listo'])
+
+            response = self.client.get(reverse('salud'))
+            self.assertEqual(response.status_code, 503)
+            self.assertIn('sin disco', response.json()['errores']['base_de_datos'])
+
+    def test_benchmark_de_render_sin_recompilar(self):
+        salida = io.StringIO()
+        call_command('medir_render_cv', '--tamanos', '3', '--repeticiones', '2', '--muestras-memoria', '1', stdout=salida)
+        self.assertIn('cache del loader: sí', salida.getvalue())
+        self.assertIn('Compilaciones de plantillas durante la medición: 0', salida.getvalue())
+
+
+# ============================================
+# TESTS: importaciones al arrancar
+# ============================================
+class ImportacionesArranqueTests(TestCase):
+
+    def test_worker_web_no_carga_pdf2image_ni_requests(self):
+        base = settings.BASE_DIR / 'db.sqlite3'
+        antes = base.stat().st_mtime_ns if base.exists() else None
+
+        salida = io.StringIO()
+        call_command('medir_importacion', '--repeticiones', '1', stdout=salida)
+        self.assertIn('Sin dependencias pesadas', salida.getvalue())
+        # Importar config.wsgi no calienta: la base real queda intacta
+        self.assertEqual(base.stat().st_mtime_ns if base.exists() else None, antes)
+
+
+# ============================================
+# TESTS: camino async de /cv/
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS)
+class CvAsyncTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_mismo_html_que_la_vista_sync(self):
+        perfil = await sync_to_async(crear_perfil)()
+        await sync_to_async(poblar_secciones)(perfil, 3)
+
+        response = await self.async_client.get(reverse('cv_async'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_certificados'], 3)
+        self.assertEqual(
+            [c.titulo for c in response.context['certificados']],
+            ['Curso 2', 'Curso 1', 'Curso 0'],
+        )
+
+        # Comparten la página cacheada: la vista sync devuelve los mismos bytes
+        sync = await sync_to_async(self.client.get)(reverse('cv'))
+        self.assertEqual(sync.content, response.content)
+        self.assertEqual(sync['ETag'], response['ETag'])
+
+    async def test_perfil_inexistente(self):
+        response = await self.async_client.get(reverse('cv_perfil_async', args=['nadie']))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_compresion_no_usa_el_cache_bloqueante(self):
+        await sync_to_async(crear_perfil)()
+        bloqueante = mock.Mock(side_effect=AssertionError('cache bloqueante en el event loop'))
+        cache_async = mock.Mock(get=bloqueante, set=bloqueante, aget=cache.aget, aset=cache.aset)
+
+        with mock.patch('cv.middleware.cache', cache_async):
+            primera = await self.async_client.get(reverse('cv_async'), headers={'accept-encoding': 'br'})
+            segunda = await self.async_client.get(reverse('cv_async'), headers={'accept-encoding': 'br'})
+        self.assertIn('br nuevo', primera['Server-Timing'])
+        self.assertIn('br cache', segunda['Server-Timing'])
+        self.assertEqual(segunda.content, primera.content)
+
+
+class CompararCvAsyncTests(TransactionTestCase):
+
+    @override_settings(CACHES=CACHE_PRUEBAS)
+    def test_reporta_ambos_caminos(self):
+        crear_perfil()
+        salida = io.StringIO()
+        call_command('comparar_cv_async', '--peticiones', '4', '--concurrencia', '2', stdout=salida)
+        self.assertRegex(salida.getvalue(), r'\nsync +\d')
+        self.assertRegex(salida.getvalue(), r'\nasync +\d')
+
+
+# ============================================
+# TESTS: ajustes de SQLite
+# ============================================
+class SqlitePragmasTests(TestCase):
+
+    def test_conexion_aplica_los_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_benchmark_lectores_y_escritor(self):
+        salida = io.StringIO()
+        call_command('medir_sqlite_concurrencia', '--segundos', '0.3', '--lectores', '2', stdout=salida)
+        self.assertRegex(salida.getvalue(), r'\npor defecto +\d')
+        self.assertRegex(salida.getvalue(), r'\najustada +\d')
+
+
+# ============================================
+# TESTS: réplicas de lectura
+# ============================================
+@override_settings(CACHES=CACHE_PRUEBAS, REPLICAS_LECTURA=['replica_1'])
+class RouterReplicasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.router = RouterReplicas()
+        # La réplica se copió con la versión actual del CV
+        parche = mock.patch('cv.routers.version_replica', return_value=str(version_actual()))
+        self.version_replica = parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_lecturas_publicas_van_a_la_replica(self):
+        self.assertIsNone(self.router.db_for_read(Perfil))
+
+        @lectura_en_replica
+        def vista(request):
+            return self.router.db_for_read(Perfil)
+
+        self.assertEqual(vista(None), 'replica_1')
+        self.version_replica.assert_called_once_with('replica_1')
+
+    def test_despues_de_escribir_sigue_en_la_principal(self):
+        @lectura_en_replica
+        def vista(request):
+            self.assertEqual(self.router.db_for_write(Perfil), 'default')
+            return self.router.db_for_read(Perfil)
+
+        self.assertIsNone(vista(None))
+
+    def test_replica_sin_el_ultimo_cambio_lee_de_la_principal(self):
+        @lectura_en_replica
+        def vista(request):
+            return self.router.db_for_read(Perfil)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            crear_perfil()
+        self.assertIsNone(vista(None))
+
+        # Recién cuando la réplica se vuelve a copiar con la versión nueva
+        self.version_replica.return_value = str(version_actual())
+        self.assertEqual(vista(None), 'replica_1')
+
+    def test_replicas_no_se_migran(self):
+        self.assertFalse(self.router.allow_migrate('replica_1', 'cv'))
+        self.assertIsNone(self.router.allow_migrate('default', 'cv'))
+
+
+class SincronizarReplicasTests(TransactionTestCase):
+    # Sin la transacción de TestCase: el backup espera a que no haya escritor
+
+    def test_sincronizar_copia_la_base_y_marca_la_version(self):
+        version = nueva_version()
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'replica.sqlite3')
+            copiar_base(connection, ruta, version)
+            with closing(sqlite3.connect(ruta)) as replica:
+                tablas = {fila[0] for fila in replica.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+                marcada = replica.execute(f'SELECT version FROM {TABLA_VERSION}').fetchall()
+        self.assertIn('cv_perfil', tablas)
+        self.assertEqual(marcada, [(str(version),)])
@@ -4,5 +4,13 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('cv/', views.cv_view, name='cv'),
+    path('cv/pdf/', views.cv_pdf_view, name='cv_pdf'),
+    path('cv/<slug:slug>/', views.cv_view, name='cv_perfil'),
+    path('cv/<slug:slug>/pdf/', views.cv_pdf_view, name='cv_pdf_perfil'),
+    # Misma página por el camino async (ASGI); ver `manage.py comparar_cv_async`
+    path('async/cv/', views.cv_async_view, name='cv_async'),
+    path('async/cv/<slug:slug>/', views.cv_async_view, name='cv_perfil_async'),
+    path('perfiles/', views.perfiles_view, name='perfiles'),
+    path('salud/', views.salud, name='salud'),
+    path('subidas/<str:id_subida>/', views.subida_progreso, name='subida_progreso'),
 ]
-
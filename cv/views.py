@@ -1,29 +1,170 @@
+import posixpath
+import re
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render
-from .models import Perfil, Educacion, Experiencia, Certificado, Reconocimiento, Proyecto, Garage, Habilidad  # ← AGREGAR Proyecto y Habilidad
+from django.urls import reverse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import condition
+from django.views.static import serve
+
+from .cache import (
+    leer_estado, guardar_pagina, clave_compresion, etag_cv, ultima_modificacion_cv,
+    leer_pdf, guardar_pdf, versiones_modelos,
+)
+from .calentamiento import estado_calentamiento
+from .pdf import secciones_desde_query, renderizar_pdf
+from .routers import lectura_en_replica
+from .services import cargar_contexto_cv, cargar_contexto_cv_async, existe_perfil, listar_perfiles
+from .subidas import leer_progreso
 
-from .models import Habilidad
+PERFILES_POR_PAGINA = 50
 
+# <sha256 truncado>[_sufijo].<ext>, como los genera cv.storage.AlmacenamientoEspejo
+NOMBRE_CON_HASH = re.compile(r'^[0-9a-f]{32}(_[A-Za-z0-9]+)?\.[A-Za-z0-9]+$')
 
+
+@lectura_en_replica
+@condition(etag_func=etag_cv, last_modified_func=ultima_modificacion_cv)
 def home(request):
     return render(request, 'cv/home.html')
 
-def cv_view(request):
-    perfil = Perfil.objects.first()
-    educacion = Educacion.objects.filter(perfil=perfil).order_by('-fecha_inicio')
-    experiencia = Experiencia.objects.filter(perfil=perfil).order_by('-fecha_inicio')
-    habilidades = Habilidad.objects.filter(perfil=perfil)
-    certificados = perfil.certificados.all().order_by('-fecha')
-    proyectos = Proyecto.objects.filter(perfil=perfil)
-    garage = Garage.objects.filter(perfil=perfil)
-    
-    context = {
-        'perfil': perfil,
-        'educacion': educacion,
-        'experiencia': experiencia,
-        'habilidades': habilidades,
-        'certificados': certificados,
-        'proyectos': proyectos,
-        'garage': garage,
-    }
-    
-    return render(request, 'cv/cv.html', context)
\ No newline at end of file
+def exigir_perfil(request, slug):
+    """
+    404 antes de que condition() compare validadores: el ETag depende solo de
+    la versión, y un GET condicional a un slug inexistente recibía 304. Si la
+    página del slug está en cache el perfil existe y no se consulta la base.
+    """
+    estado = leer_estado(request, slug)
+    if slug is not None and estado.contenido is None and not existe_perfil(slug):
+        raise Http404('Perfil no encontrado')
+
+
+def con_perfil_existente(vista):
+    @wraps(vista)
+    def envoltura(request, slug=None):
+        exigir_perfil(request, slug)
+        return vista(request, slug)
+    return envoltura
+
+@lectura_en_replica
+@con_perfil_existente
+@condition(etag_func=etag_cv, last_modified_func=ultima_modificacion_cv)
+def cv_view(request, slug=None):
+    estado = leer_estado(request, slug)
+    if estado.contenido is not None:
+        response = HttpResponse(estado.contenido)
+    else:
+        # Versiones antes que los datos (como leer_estado con la de la página):
+        # si un cambio entra en medio, el HTML viejo queda con la versión vieja
+        versiones = versiones_modelos()
+        context = cargar_contexto_cv(slug)
+        if slug is not None and context['perfil'] is None:
+            raise Http404('Perfil no encontrado')
+
+        # Las secciones cuyo modelo no cambió salen del cache (cv_fragmentos)
+        context['versiones_modelos'] = versiones
+        response = render(request, 'cv/cv.html', context)
+        guardar_pagina(estado.version, response.content, slug)
+
+    # Mismo HTML por versión: cv.middleware reutiliza los bytes comprimidos
+    response.clave_compresion = clave_compresion(estado.version, slug)
+    return response
+
+def con_estado_leido(vista):
+    """
+    Para vistas async: lee el estado del cache y comprueba el perfil (ambos
+    pueden consultar la base) en un hilo antes de que condition() calcule
+    ETag y Last-Modified.
+    """
+    @wraps(vista)
+    async def envoltura(request, slug=None):
+        await sync_to_async(exigir_perfil)(request, slug)
+        return await vista(request, slug)
+    return envoltura
+
+@lectura_en_replica
+@con_estado_leido
+@condition(etag_func=etag_cv, last_modified_func=ultima_modificacion_cv)
+async def cv_async_view(request, slug=None):
+    """
+    cv_view para ASGI: mismas claves de cache y mismo HTML, pero las secciones
+    se cargan con el ORM async y el worker no se bloquea mientras espera.
+    """
+    estado = leer_estado(request, slug)
+    if estado.contenido is not None:
+        response = HttpResponse(estado.contenido)
+    else:
+        versiones = await sync_to_async(versiones_modelos)()
+        context = await cargar_contexto_cv_async(slug)
+        if slug is not None and context['perfil'] is None:
+            raise Http404('Perfil no encontrado')
+
+        context['versiones_modelos'] = versiones
+        response = await sync_to_async(render)(request, 'cv/cv.html', context)
+        await sync_to_async(guardar_pagina)(estado.version, response.content, slug)
+
+    response.clave_compresion = clave_compresion(estado.version, slug)
+    return response
+
+def cv_pdf_view(request, slug=None):
+    secciones = secciones_desde_query(request)
+    version = leer_estado(request, slug).version
+
+    contenido = leer_pdf(version, slug, secciones)
+    if contenido is None:
+        context = cargar_contexto_cv(slug)
+        if slug is not None and context['perfil'] is None:
+            raise Http404('Perfil no encontrado')
+        contenido = renderizar_pdf(context, secciones, request.build_absolute_uri('/'))
+        guardar_pdf(version, slug, secciones, contenido)
+
+    response = HttpResponse(contenido, content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="cv-{slug or "perfil"}.pdf"'
+    return response
+
+def perfiles_view(request):
+    perfiles, siguiente = listar_perfiles(
+        despues=request.GET.get('despues'),
+        limite=PERFILES_POR_PAGINA,
+    )
+    return JsonResponse({
+        'perfiles': [
+            {
+                'nombre': perfil.nombre,
+                'profesion': perfil.profesion,
+                'slug': perfil.slug,
+                'url': reverse('cv_perfil', args=[perfil.slug]),
+            }
+            for perfil in perfiles
+        ],
+        'siguiente': f"{reverse('perfiles')}?despues={siguiente}" if siguiente else None,
+    })
+
+def media_local(request, path):
+    # Nada que empiece con '.' (la cola del espejo, subidas a medio escribir)
+    if any(parte.startswith('.') for parte in path.split('/')):
+        raise Http404
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if NOMBRE_CON_HASH.match(posixpath.basename(path)):
+        response['Cache-Control'] = settings.MEDIA_CACHE_CONTROL
+    return response
+
+@staff_member_required
+def subida_progreso(request, id_subida):
+    """Avance de una subida del admin (lo publica cv.subidas)"""
+    progreso = leer_progreso(id_subida)
+    if progreso is None:
+        raise Http404
+    return JsonResponse(progreso)
+
+@never_cache
+def salud(request):
+    """Health check: 503 hasta que este proceso termina cv.calentamiento.calentar()"""
+    estado = estado_calentamiento()
+    return JsonResponse(estado, status=200 if estado['listo'] else 503)
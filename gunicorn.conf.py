@@ -0,0 +1,17 @@
+# Gunicorn lo lee solo desde el directorio de trabajo: `gunicorn config.wsgi`
+
+# La app se carga una vez en el master; los workers nacen con ella en memoria
+preload_app = True
+
+
+def when_ready(server):
+    # En el master, antes del fork: lo que se hereda sin abrir la base
+    from cv.calentamiento import calentar
+    calentar(pasos=('urls', 'plantillas'))
+
+
+def post_fork(server, worker):
+    # Cada worker: conexión propia, cliente de storage y /cv/ en el cache.
+    # /salud/ responde 503 hasta que esto termina sin errores.
+    from cv.calentamiento import calentar
+    calentar()